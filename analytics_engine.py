@@ -13,29 +13,209 @@ Features:
 - Adaptive Learning from user feedback
 """
 
+import heapq
 import json
+import os
 import logging
 import pickle
 import hashlib
 from typing import Dict, List, Any, Optional, Tuple, Set
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 import re
 import math
+import zlib
 from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
 
 from postgres_database import PostgreSQLCICDFixerDB
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
+def get_db() -> PostgreSQLCICDFixerDB:
+    """Shared database handle for the analytics classes.
+
+    Every class here used to construct its own PostgreSQLCICDFixerDB;
+    one cached instance is enough since connections come from the pool.
+    """
+    return PostgreSQLCICDFixerDB()
+
+
+# Error classification patterns, fused into a single alternation regex at
+# import time. One named group per error type means classification is a
+# single pass over the log instead of ~35 separate re.search scans.
+_ERROR_PATTERNS = {
+        "dependency_error": [
+            r"npm.*install.*failed",
+            r"pip.*install.*error",
+            r"package.*not.*found",
+            r"dependency.*conflict",
+            r"peer.*dependency",
+            r"ModuleNotFoundError",
+            r"ImportError"
+        ],
+        "build_failure": [
+            r"compilation.*failed",
+            r"build.*failed",
+            r"webpack.*error",
+            r"typescript.*error",
+            r"syntax.*error",
+            r"compilation error"
+        ],
+        "test_failure": [
+            r"test.*failed",
+            r"assertion.*failed",
+            r"jest.*failed",
+            r"pytest.*failed",
+            r"unit.*test.*error",
+            r"integration.*test.*failed"
+        ],
+        "execution_timeout": [
+            r"timeout",
+            r"exceeded.*time",
+            r"job.*cancelled",
+            r"process.*killed",
+            r"time.*limit.*exceeded"
+        ],
+        "docker_error": [
+            r"docker.*build.*failed",
+            r"dockerfile.*error",
+            r"container.*failed",
+            r"image.*not.*found",
+            r"docker.*push.*failed"
+        ],
+        "linting_error": [
+            r"eslint.*error",
+            r"pylint.*error",
+            r"flake8.*error",
+            r"prettier.*error",
+            r"code.*style.*violation"
+        ],
+        "deployment_error": [
+            r"deployment.*failed",
+            r"publish.*failed",
+            r"release.*error",
+            r"upload.*failed",
+            r"deploy.*timeout"
+        ]
+}
+
+_COMBINED_ERROR_RE = re.compile(
+    "|".join(
+        f"(?P<{error_type}>{'|'.join(patterns)})"
+        for error_type, patterns in _ERROR_PATTERNS.items()
+    )
+)
+
+# Language indicators, likewise fused into one alternation regex with a
+# named group per language. Detection is a single linear scan of the text
+# instead of ~40 independent substring searches per row.
+_LANGUAGE_INDICATORS = {
+    "javascript": ["package.json", "npm", "yarn", "node", "webpack", "jest", ".js", ".ts"],
+    "python": ["requirements.txt", "pip", "pytest", "python", ".py", "virtualenv"],
+    "java": ["maven", "gradle", "junit", ".java", "mvn", "pom.xml"],
+    "csharp": [".net", "dotnet", "nuget", ".cs", "msbuild"],
+    "go": ["go.mod", "go build", ".go", "golang"],
+    "rust": ["cargo", ".rs", "rustc", "rust"],
+    "ruby": ["gemfile", "bundle", ".rb", "rake"],
+    "php": ["composer", ".php", "phpunit"],
+    "docker": ["dockerfile", "docker", "container"]
+}
+
+_LANGUAGE_INDICATOR_RE = re.compile(
+    "|".join(
+        f"(?P<{language}>{'|'.join(re.escape(ind) for ind in indicators)})"
+        for language, indicators in _LANGUAGE_INDICATORS.items()
+    )
+)
+
+# Signature extraction/normalization patterns used by
+# MLPatternRecognizer.extract_error_signature, also compiled once.
+_SIGNATURE_EXTRACT_PATTERNS = [
+    re.compile(r"error:?\s*(.+?)(?:\n|$)"),
+    re.compile(r"failed:?\s*(.+?)(?:\n|$)"),
+    re.compile(r"exception:?\s*(.+?)(?:\n|$)"),
+    re.compile(r"(\w+error\w*)"),
+    re.compile(r"(\w+exception\w*)"),
+]
+
+_FILE_PATH_RE = re.compile(r'/[\w/.-]+\.\w+')
+_LINE_NUM_RE = re.compile(r'line\s+\d+')
+_TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}:\d{2}:\d{2}')
+_NUMBER_RE = re.compile(r'\b\d+\b(?![a-z])')
+
+# Shared word tokenizer for similarity comparisons; lowercasing keeps token
+# equality case-insensitive while \w+ itself matches either case.
+_WORD_RE = re.compile(r'\w+')
+
+# Fix-complexity indicators, compiled once instead of per assessment.
+_CONFIG_FILE_RE = re.compile(r'\.(json|yaml|yml|xml|config)')
+_DEPENDENCY_CHANGE_RE = re.compile(r'install|upgrade|add.*dependency')
+
+# Package-manager commands worth surfacing from historical fixes.
+_CMD_RE = re.compile(r'\b(?:npm|pip|apt|yarn|mvn|gradle)\b', re.IGNORECASE)
+
+# Confidence-score buckets, highest threshold first.
+_CONFIDENCE_BUCKETS = ((0.8, "Very High"), (0.6, "High"),
+                       (0.4, "Medium"), (0.2, "Low"))
+
+# Fixed random-ish coefficients for the MinHash permutations. Seeded so
+# signatures stay comparable across processes and restarts.
+_MINHASH_PERMS = 128
+_minhash_rng = np.random.RandomState(42)
+# Odd 64-bit multipliers so the multiply-shift hash wraps mod 2**64 and
+# each slot behaves like an independent permutation of the token hashes.
+_MINHASH_A = (
+    (_minhash_rng.randint(0, 2**32, size=_MINHASH_PERMS).astype(np.uint64) << np.uint64(32))
+    | _minhash_rng.randint(0, 2**32, size=_MINHASH_PERMS).astype(np.uint64)
+) | np.uint64(1)
+_MINHASH_B = _minhash_rng.randint(0, 2**32, size=_MINHASH_PERMS).astype(np.uint64)
+
+
+def _minhash_signature(tokens) -> np.ndarray:
+    """Compute a 128-slot uint32 MinHash signature for a token set.
+
+    Jaccard similarity between two token sets is then estimated as the
+    fraction of matching slots - a vectorized uint32 compare instead of
+    building Python sets for every pairwise comparison.
+    """
+    if not tokens:
+        return np.full(_MINHASH_PERMS, np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    hashes = np.fromiter(
+        (zlib.crc32(token.encode()) for token in tokens),
+        dtype=np.uint64, count=len(tokens)
+    )
+    # (a * h + b) with uint64 wraparound, keeping the top 32 bits per slot.
+    slot_values = _MINHASH_A[:, None] * hashes[None, :] + _MINHASH_B[:, None]
+    return (slot_values >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+
+def _minhash_similarities(corpus_matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of a query signature against a corpus.
+
+    The whole scoring kernel is this one vectorized compare; counting
+    matches over the last axis and dividing once keeps it in a single
+    integer pass instead of a float64 mean reduction.
+    """
+    matches = np.count_nonzero(corpus_matrix == query, axis=-1)
+    return matches.astype(np.float32) / _MINHASH_PERMS
+
+
 class CICDPatternAnalyzer:
     """
     Analyzes patterns in CI/CD failures and fixes to improve future suggestions.
     """
     
     def __init__(self):
-        self.db = PostgreSQLCICDFixerDB()
+        self.db = get_db()
     
     def analyze_failure_patterns(self, days_back: int = 30) -> Dict[str, Any]:
         """
@@ -48,35 +228,97 @@ class CICDPatternAnalyzer:
             Dictionary containing pattern analysis results
         """
         try:
-           
+
             cutoff_date = datetime.utcnow() - timedelta(days=days_back)
-            
+
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
-                
+
+
                 cursor.execute("""
-                    SELECT repo_name, owner, workflow_name, status, conclusion, 
-                           error_log, suggested_fix, fix_status, created_at
-                    FROM workflow_runs 
+                    SELECT COUNT(*) FROM workflow_runs WHERE created_at >= %s
+                """, (cutoff_date,))
+                total_runs = cursor.fetchone()[0]
+
+                if not total_runs:
+                    return {
+                        "summary": "No workflow runs found in the specified period",
+                        "patterns": {},
+                        "recommendations": []
+                    }
+
+
+                cursor.execute("""
+                    SELECT owner, repo_name, COUNT(*)
+                    FROM workflow_runs
                     WHERE created_at >= %s
-                    ORDER BY created_at DESC
+                    GROUP BY owner, repo_name
+                    ORDER BY COUNT(*) DESC
                 """, (cutoff_date,))
-                
-                runs = cursor.fetchall()
-                
-            if not runs:
-                return {
-                    "summary": "No workflow runs found in the specified period",
-                    "patterns": {},
-                    "recommendations": []
-                }
-            
-          
-            patterns = self._extract_patterns(runs)
-            
+                repo_rows = cursor.fetchall()
+
+
+                cursor.execute("""
+                    SELECT EXTRACT(hour FROM created_at)::int, COUNT(*)
+                    FROM workflow_runs
+                    WHERE created_at >= %s AND created_at IS NOT NULL
+                    GROUP BY 1
+                """, (cutoff_date,))
+                hour_rows = cursor.fetchall()
+
+
+                cursor.execute("""
+                    SELECT owner, repo_name,
+                           COUNT(*) as total,
+                           SUM(CASE WHEN fix_status = 'approved' THEN 1 ELSE 0 END) as approved
+                    FROM workflow_runs
+                    WHERE created_at >= %s
+                    AND suggested_fix IS NOT NULL
+                    AND fix_status IS NOT NULL
+                    GROUP BY owner, repo_name
+                """, (cutoff_date,))
+                fix_rows = cursor.fetchall()
+
+
+                # Stream the log scan through a named (server-side) cursor so
+                # the full window is never materialized client-side; batches
+                # of itersize rows are classified as they arrive. Plain
+                # defaultdict(int) counters and locally-bound methods keep
+                # the per-row cost down in this hot loop.
+                error_types = defaultdict(int)
+                language_patterns = defaultdict(int)
+                classify = self._classify_error_types
+                detect_language = self._detect_project_language
+                # A repo's language is stable across its runs, so detect it
+                # once per repo_name instead of rescanning every log.
+                repo_lang_cache: Dict[str, Optional[str]] = {}
+                with conn.cursor(name='wf_log_scan') as log_cursor:
+                    log_cursor.itersize = 2000
+                    log_cursor.execute("""
+                        SELECT repo_name, error_log
+                        FROM workflow_runs
+                        WHERE created_at >= %s AND error_log IS NOT NULL
+                    """, (cutoff_date,))
+
+                    for repo_name, error_log in log_cursor:
+                        for error_type in classify(error_log):
+                            error_types[error_type] += 1
+
+                        if repo_name in repo_lang_cache:
+                            language = repo_lang_cache[repo_name]
+                        else:
+                            language = detect_language(repo_name, error_log)
+                            repo_lang_cache[repo_name] = language
+                        if language:
+                            language_patterns[language] += 1
+
+
+            patterns = self._extract_patterns(repo_rows, hour_rows, fix_rows,
+                                              error_types, language_patterns)
+
             return {
                 "analysis_period": f"Last {days_back} days",
-                "total_runs": len(runs),
+                "total_runs": total_runs,
                 "patterns": patterns,
                 "recommendations": self._generate_recommendations(patterns),
                 "analyzed_at": datetime.utcnow().isoformat()
@@ -90,58 +332,34 @@ class CICDPatternAnalyzer:
                 "recommendations": []
             }
     
-    def _extract_patterns(self, runs: List[Tuple]) -> Dict[str, Any]:
-        """Extract patterns from workflow run data."""
-        
-     
-        repo_failures = Counter()
-        error_types = Counter()
-        time_patterns = defaultdict(int)
-        fix_success_rates = defaultdict(lambda: {"total": 0, "approved": 0})
-        language_patterns = Counter()
-        
-        for run in runs:
-            repo_name, owner, workflow_name, status, conclusion, error_log, suggested_fix, fix_status, created_at = run
-          
-            repo_key = f"{owner}/{repo_name}"
-            repo_failures[repo_key] += 1
-            
-          
-            if error_log:
-                error_types.update(self._classify_error_types(error_log))
-            
-           
-            if created_at:
-                hour = created_at.hour
-                time_patterns[hour] += 1
-            
-   
-            if suggested_fix and fix_status:
-                fix_success_rates[repo_key]["total"] += 1
-                if fix_status == "approved":
-                    fix_success_rates[repo_key]["approved"] += 1
-            
-          
-            language = self._detect_project_language(repo_name, error_log)
-            if language:
-                language_patterns[language] += 1
-        
-     
+    def _extract_patterns(self, repo_rows: List[Tuple], hour_rows: List[Tuple],
+                          fix_rows: List[Tuple], error_types: Dict[str, int],
+                          language_patterns: Dict[str, int]) -> Dict[str, Any]:
+        """Assemble pattern stats from pre-aggregated and pre-classified data.
+
+        Repo/hour/fix counts arrive already grouped by PostgreSQL; the error
+        type and language counters come from the streamed log scan.
+        """
+
+        repo_failures = Counter({f"{owner}/{repo}": count for owner, repo, count in repo_rows})
+
+        time_patterns = {hour: count for hour, count in hour_rows}
+
         success_rates = {}
-        for repo, stats in fix_success_rates.items():
-            if stats["total"] > 0:
-                success_rates[repo] = {
-                    "success_rate": stats["approved"] / stats["total"],
-                    "total_fixes": stats["total"],
-                    "approved_fixes": stats["approved"]
+        for owner, repo, total, approved in fix_rows:
+            if total > 0:
+                success_rates[f"{owner}/{repo}"] = {
+                    "success_rate": approved / total,
+                    "total_fixes": total,
+                    "approved_fixes": approved
                 }
-        
+
         return {
             "most_failing_repos": dict(repo_failures.most_common(10)),
-            "common_error_types": dict(error_types.most_common(15)),
-            "failure_time_distribution": dict(time_patterns),
+            "common_error_types": dict(heapq.nlargest(15, error_types.items(), key=lambda kv: kv[1])),
+            "failure_time_distribution": time_patterns,
             "fix_success_rates": success_rates,
-            "language_distribution": dict(language_patterns.most_common(10)),
+            "language_distribution": dict(heapq.nlargest(10, language_patterns.items(), key=lambda kv: kv[1])),
             "total_unique_repos": len(repo_failures),
             "total_error_types": len(error_types)
         }
@@ -150,102 +368,30 @@ class CICDPatternAnalyzer:
         """Classify error types from error logs."""
         if not error_log:
             return []
-        
-        error_patterns = {
-            "dependency_error": [
-                r"npm.*install.*failed",
-                r"pip.*install.*error",
-                r"package.*not.*found",
-                r"dependency.*conflict",
-                r"peer.*dependency",
-                r"ModuleNotFoundError",
-                r"ImportError"
-            ],
-            "build_failure": [
-                r"compilation.*failed",
-                r"build.*failed",
-                r"webpack.*error",
-                r"typescript.*error",
-                r"syntax.*error",
-                r"compilation error"
-            ],
-            "test_failure": [
-                r"test.*failed",
-                r"assertion.*failed",
-                r"jest.*failed",
-                r"pytest.*failed",
-                r"unit.*test.*error",
-                r"integration.*test.*failed"
-            ],
-            "execution_timeout": [
-                r"timeout",
-                r"exceeded.*time",
-                r"job.*cancelled",
-                r"process.*killed",
-                r"time.*limit.*exceeded"
-            ],
-            "docker_error": [
-                r"docker.*build.*failed",
-                r"dockerfile.*error",
-                r"container.*failed",
-                r"image.*not.*found",
-                r"docker.*push.*failed"
-            ],
-            "linting_error": [
-                r"eslint.*error",
-                r"pylint.*error",
-                r"flake8.*error",
-                r"prettier.*error",
-                r"code.*style.*violation"
-            ],
-            "deployment_error": [
-                r"deployment.*failed",
-                r"publish.*failed",
-                r"release.*error",
-                r"upload.*failed",
-                r"deploy.*timeout"
-            ]
-        }
-        
-        detected_errors = []
+
         error_text = error_log.lower()
-        
-        for error_type, patterns in error_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, error_text):
-                    detected_errors.append(error_type)
-                    break 
-        
-        return detected_errors
+
+        detected = {m.lastgroup for m in _COMBINED_ERROR_RE.finditer(error_text)}
+
+        # Preserve the declaration order so the "primary" type stays stable.
+        return [error_type for error_type in _ERROR_PATTERNS if error_type in detected]
     
     def _detect_project_language(self, repo_name: str, error_log: str) -> Optional[str]:
         """Detect the primary programming language of a project."""
-        
-      
-        language_indicators = {
-            "javascript": ["package.json", "npm", "yarn", "node", "webpack", "jest", ".js", ".ts"],
-            "python": ["requirements.txt", "pip", "pytest", "python", ".py", "virtualenv"],
-            "java": ["maven", "gradle", "junit", ".java", "mvn", "pom.xml"],
-            "csharp": [".net", "dotnet", "nuget", ".cs", "msbuild"],
-            "go": ["go.mod", "go build", ".go", "golang"],
-            "rust": ["cargo", ".rs", "rustc", "rust"],
-            "ruby": ["gemfile", "bundle", ".rb", "rake"],
-            "php": ["composer", ".php", "phpunit"],
-            "docker": ["dockerfile", "docker", "container"]
-        }
-        
+
         text_to_analyze = f"{repo_name} {error_log or ''}".lower()
-        
-        language_scores = {}
-        for language, indicators in language_indicators.items():
-            score = sum(1 for indicator in indicators if indicator in text_to_analyze)
-            if score > 0:
-                language_scores[language] = score
-        
-   
+
+        # Score each language by how many distinct indicators appear,
+        # collected in one pass over the text.
+        seen_indicators = {
+            (m.lastgroup, m.group()) for m in _LANGUAGE_INDICATOR_RE.finditer(text_to_analyze)
+        }
+
+        language_scores = Counter(language for language, _ in seen_indicators)
+
         if language_scores:
-            return max(language_scores.items(), key=lambda x: x[1])[0]
-        
+            return language_scores.most_common(1)[0][0]
+
         return None
     
     def _generate_recommendations(self, patterns: Dict[str, Any]) -> List[str]:
@@ -254,7 +400,7 @@ class CICDPatternAnalyzer:
         
       
         if patterns.get("most_failing_repos"):
-            top_failing = list(patterns["most_failing_repos"].keys())[0]
+            top_failing = next(iter(patterns["most_failing_repos"]))
             recommendations.append(
                 f"Consider creating specialized fix templates for {top_failing} "
                 f"which has {patterns['most_failing_repos'][top_failing]} failures"
@@ -262,7 +408,7 @@ class CICDPatternAnalyzer:
         
      
         if patterns.get("common_error_types"):
-            top_error = list(patterns["common_error_types"].keys())[0]
+            top_error = next(iter(patterns["common_error_types"]))
             count = patterns["common_error_types"][top_error]
             recommendations.append(
                 f"Focus on improving {top_error} detection and fixes - "
@@ -271,7 +417,7 @@ class CICDPatternAnalyzer:
    
         if patterns.get("failure_time_distribution"):
             time_dist = patterns["failure_time_distribution"]
-            peak_hour = max(time_dist.items(), key=lambda x: x[1])
+            peak_hour = max(time_dist.items(), key=itemgetter(1))
             recommendations.append(
                 f"Most failures occur at {peak_hour[0]:02d}:00 UTC "
                 f"({peak_hour[1]} failures) - consider proactive monitoring"
@@ -279,7 +425,7 @@ class CICDPatternAnalyzer:
         
 
         if patterns.get("language_distribution"):
-            top_lang = list(patterns["language_distribution"].keys())[0]
+            top_lang = next(iter(patterns["language_distribution"]))
             recommendations.append(
                 f"Enhance {top_lang} specific error detection and fix generation"
             )
@@ -298,89 +444,85 @@ class CICDPatternAnalyzer:
         
         return recommendations
     
+    def _fetch_all(self, query: str) -> List[Tuple]:
+        """Run a read-only query on its own connection and fetch all rows."""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            return cursor.fetchall()
+
     def get_fix_effectiveness_stats(self) -> Dict[str, Any]:
         """Get statistics on fix effectiveness and approval rates."""
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                
-              
-                cursor.execute("""
-                    SELECT DISTINCT fix_status, COUNT(*) 
-                    FROM workflow_runs 
+            # The three queries are independent reads, so issue them in
+            # parallel on separate connections instead of serially on one.
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                status_future = executor.submit(self._fetch_all, """
+                    SELECT DISTINCT fix_status, COUNT(*)
+                    FROM workflow_runs
                     WHERE fix_status IS NOT NULL
                     GROUP BY fix_status
                     ORDER BY COUNT(*) DESC
                 """)
-                
-                status_counts = cursor.fetchall()
-                logger.info(f"Fix statuses found in database: {[row[0] for row in status_counts]}")
-                
-             
-                cursor.execute("""
-                    SELECT 
+                overall_future = executor.submit(self._fetch_all, """
+                    SELECT
                         COUNT(*) as total_fixes,
                         COUNT(CASE WHEN fix_status IN ('approved', 'accepted', 'applied') THEN 1 END) as approved_fixes,
                         COUNT(CASE WHEN fix_status IN ('rejected', 'declined', 'denied') THEN 1 END) as rejected_fixes,
                         COUNT(CASE WHEN fix_status IN ('pending', 'suggested', 'waiting') THEN 1 END) as pending_fixes
-                    FROM workflow_runs 
+                    FROM workflow_runs
                     WHERE suggested_fix IS NOT NULL OR fix_status IS NOT NULL
                 """)
-                
-                result = cursor.fetchone()
-                
-             
-                if not result:
-                    stats = (0, 0, 0, 0)
-                else:
-                    stats = result
-                
-                if not stats or stats[0] == 0:
-                    return {
-                        "message": "No fix data available yet",
-                        "total_fixes": 0,
-                        "overall_stats": {
-                            "total_fixes": 0,
-                            "approved_fixes": 0,
-                            "rejected_fixes": 0,
-                            "pending_fixes": 0,
-                            "approval_rate": 0,
-                            "rejection_rate": 0
-                        },
-                        "status_distribution": {}
-                    }
-                
-                total, approved, rejected, pending = stats
-                
-               
-                cursor.execute("""
+                effectiveness_future = executor.submit(self._fetch_all, """
                     SELECT error_log, fix_status, COUNT(*)
-                    FROM workflow_runs 
+                    FROM workflow_runs
                     WHERE (suggested_fix IS NOT NULL OR fix_status IS NOT NULL)
                     AND error_log IS NOT NULL
                     GROUP BY error_log, fix_status
                 """)
-                
-                effectiveness_data = cursor.fetchall()
-                
-              
-                status_distribution = {status: count for status, count in status_counts}
-                
+
+                status_counts = status_future.result()
+                overall_rows = overall_future.result()
+                effectiveness_data = effectiveness_future.result()
+
+            logger.info(f"Fix statuses found in database: {[row[0] for row in status_counts]}")
+
+            stats = overall_rows[0] if overall_rows else (0, 0, 0, 0)
+
+            if not stats or stats[0] == 0:
                 return {
+                    "message": "No fix data available yet",
+                    "total_fixes": 0,
                     "overall_stats": {
-                        "total_fixes": total,
-                        "approved_fixes": approved,
-                        "rejected_fixes": rejected,
-                        "pending_fixes": pending,
-                        "approval_rate": round(approved / total * 100, 2) if total > 0 else 0,
-                        "rejection_rate": round(rejected / total * 100, 2) if total > 0 else 0,
-                        "pending_rate": round(pending / total * 100, 2) if total > 0 else 0
+                        "total_fixes": 0,
+                        "approved_fixes": 0,
+                        "rejected_fixes": 0,
+                        "pending_fixes": 0,
+                        "approval_rate": 0,
+                        "rejection_rate": 0
                     },
-                    "status_distribution": status_distribution,
-                    "effectiveness_by_type": self._analyze_effectiveness_by_type(effectiveness_data),
-                    "generated_at": datetime.utcnow().isoformat()
+                    "status_distribution": {}
                 }
-                
+
+            total, approved, rejected, pending = stats
+
+            status_distribution = {status: count for status, count in status_counts}
+
+            return {
+                "overall_stats": {
+                    "total_fixes": total,
+                    "approved_fixes": approved,
+                    "rejected_fixes": rejected,
+                    "pending_fixes": pending,
+                    "approval_rate": round(approved / total * 100, 2) if total > 0 else 0,
+                    "rejection_rate": round(rejected / total * 100, 2) if total > 0 else 0,
+                    "pending_rate": round(pending / total * 100, 2) if total > 0 else 0
+                },
+                "status_distribution": status_distribution,
+                "effectiveness_by_type": self._analyze_effectiveness_by_type(effectiveness_data),
+                "generated_at": datetime.utcnow().isoformat()
+            }
+
         except Exception as e:
             logger.error(f"Error getting fix effectiveness stats: {e}")
             return {
@@ -431,13 +573,19 @@ class CICDPatternAnalyzer:
         return effectiveness
 
 
+@lru_cache(maxsize=1)
+def get_pattern_analyzer() -> CICDPatternAnalyzer:
+    """Shared stateless pattern analyzer instance."""
+    return CICDPatternAnalyzer()
+
+
 class RepositoryLearningSystem:
     """
     Builds and maintains a knowledge base for each repository.
     """
     
     def __init__(self):
-        self.db = PostgreSQLCICDFixerDB()
+        self.db = get_db()
     
     def build_repository_profile(self, owner: str, repo_name: str) -> Dict[str, Any]:
         """
@@ -493,7 +641,9 @@ class RepositoryLearningSystem:
         error_patterns = Counter()
         fix_patterns = []
         success_trends = []
-        
+
+        analyzer = get_pattern_analyzer()
+
         for run in runs:
             workflow_name, status, conclusion, error_log, suggested_fix, fix_status, created_at = run
             
@@ -503,7 +653,6 @@ class RepositoryLearningSystem:
             
           
             if error_log:
-                analyzer = CICDPatternAnalyzer()
                 error_types = analyzer._classify_error_types(error_log)
                 error_patterns.update(error_types)
            
@@ -587,119 +736,288 @@ class MLPatternRecognizer:
     Machine Learning-based pattern recognition for CI/CD failures.
     Uses similarity matching and clustering to identify related issues.
     """
-    
+
+    # How many approved historical fixes to keep in the similarity corpus
+    # and how long a loaded corpus stays fresh before it is refetched.
+    CORPUS_LIMIT = 500
+    CORPUS_TTL_SECONDS = 300
+
+    # On-disk cache for the corpus MinHash matrix; versioned so a changed
+    # corpus triggers a rebuild.
+    _MINHASH_CACHE_FILE = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), ".minhash_corpus.npz"
+    )
+
     def __init__(self):
-        self.db = PostgreSQLCICDFixerDB()
-        self.learned_patterns: List[FixPattern] = []
+        self.db = get_db()
+        self.learned_patterns: Dict[str, FixPattern] = {}
+        self._similarity_corpus: Optional[List[Dict[str, Any]]] = None
+        self._corpus_minhash: Optional[np.ndarray] = None
+        self._corpus_signature_index: Dict[str, List[int]] = {}
+        self._corpus_loaded_at: Optional[datetime] = None
         self.load_learned_patterns()
     
-    def extract_error_signature(self, error_log: str) -> str:
-        """Extract a normalized signature from error log for similarity matching."""
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def extract_error_signature(error_log: str) -> str:
+        """Extract a normalized signature from error log for similarity matching.
+
+        Memoized: the same historical logs get signatured over and over as
+        lookups repeat, so cache hits skip the regex passes and MD5 entirely.
+        """
         if not error_log:
             return ""
         
       
         normalized = error_log.lower()
-        
-     
-        patterns = [
-            r"error:?\s*(.+?)(?:\n|$)",
-            r"failed:?\s*(.+?)(?:\n|$)",
-            r"exception:?\s*(.+?)(?:\n|$)",
-            r"(\w+error\w*)",
-            r"(\w+exception\w*)",
-        ]
-        
+
         extracted_parts = []
-        for pattern in patterns:
-            matches = re.findall(pattern, normalized)
-            extracted_parts.extend(matches[:3])  
-        
-       
+        for pattern in _SIGNATURE_EXTRACT_PATTERNS:
+            matches = pattern.findall(normalized)
+            extracted_parts.extend(matches[:3])
+
+
         cleaned_parts = []
         for part in extracted_parts:
-          
-            part = re.sub(r'/[\w/.-]+\.\w+', '<file>', part)
-           
-            part = re.sub(r'line\s+\d+', 'line <num>', part)
-           
-            part = re.sub(r'\d{4}-\d{2}-\d{2}|\d{2}:\d{2}:\d{2}', '<time>', part)
-           
-            part = re.sub(r'\b\d+\b(?![a-z])', '<num>', part)
+
+            part = _FILE_PATH_RE.sub('<file>', part)
+
+            part = _LINE_NUM_RE.sub('line <num>', part)
+
+            part = _TIMESTAMP_RE.sub('<time>', part)
+
+            part = _NUMBER_RE.sub('<num>', part)
             
             if len(part.strip()) > 10:  
                 cleaned_parts.append(part.strip())
         
        
-        signature_text = " | ".join(cleaned_parts[:5])  
-        return hashlib.md5(signature_text.encode()).hexdigest()[:16]
+        signature_text = " | ".join(cleaned_parts[:5])
+        # Signatures are identifiers, not security artifacts; blake2b with an
+        # 8-byte digest is much cheaper than MD5 and yields the same 16 hex
+        # chars downstream code expects.
+        return hashlib.blake2b(signature_text.encode(), digest_size=8).hexdigest()
     
-    def calculate_similarity(self, sig1: str, sig2: str, log1: str, log2: str) -> float:
-        """Calculate similarity between two error signatures and logs."""
-        if sig1 == sig2:
-            return 1.0
-        
-     
-        words1 = set(re.findall(r'\w+', log1.lower()))
-        words2 = set(re.findall(r'\w+', log2.lower()))
-        
+    @staticmethod
+    def _jaccard(words1: frozenset, words2: frozenset) -> float:
+        """Jaccard similarity between two pre-tokenized word sets."""
         if not words1 and not words2:
             return 0.0
-        
+
         intersection = len(words1.intersection(words2))
         union = len(words1.union(words2))
-        
+
         return intersection / union if union > 0 else 0.0
+
+    def calculate_similarity(self, sig1: str, sig2: str, log1: str, log2: str) -> float:
+        """Calculate similarity between two error signatures and logs."""
+        if sig1 == sig2:
+            return 1.0
+
+        words1 = frozenset(_WORD_RE.findall(log1.lower()))
+        words2 = frozenset(_WORD_RE.findall(log2.lower()))
+
+        return self._jaccard(words1, words2)
     
-    def find_similar_fixes(self, error_log: str, repo_context: str, 
-                          min_similarity: float = 0.3) -> List[Dict[str, Any]]:
-        """Find similar fixes based on error patterns and repository context."""
-        error_signature = self.extract_error_signature(error_log)
+    def _load_similarity_corpus(self) -> List[Dict[str, Any]]:
+        """Load (and cache) the approved historical fixes used for matching.
+
+        The corpus is fetched once and each row's signature and token set
+        are precomputed at load time, so lookups don't re-pull 500 rows or
+        re-run the signature regexes per comparison. A short TTL keeps the
+        cache reasonably fresh as new fixes get approved.
+        """
+        now = datetime.utcnow()
+        if (self._similarity_corpus is not None and self._corpus_loaded_at is not None
+                and (now - self._corpus_loaded_at).total_seconds() < self.CORPUS_TTL_SECONDS):
+            return self._similarity_corpus
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT DISTINCT error_log, suggested_fix, fix_status,
+                       repo_name, owner, created_at
+                FROM workflow_runs
+                WHERE suggested_fix IS NOT NULL
+                AND fix_status = 'approved'
+                AND error_log IS NOT NULL
+                ORDER BY created_at DESC
+                LIMIT %s
+            """, (self.CORPUS_LIMIT,))
+
+            historical_fixes = cursor.fetchall()
+
+        corpus = []
+        for hist_error, hist_fix, status, repo, owner, created in historical_fixes:
+            corpus.append({
+                "error_log": hist_error,
+                "signature": self.extract_error_signature(hist_error),
+                "fix": hist_fix,
+                "repository": f"{owner}/{repo}",
+                "created": created
+            })
+
+        # Stack all MinHash signatures into one (N, 128) uint32 matrix so a
+        # lookup is a single vectorized compare against the whole corpus.
+        # Hashing every log dominates cold start, so the matrix is cached on
+        # disk keyed by a corpus version tag and memory-mapped back when the
+        # corpus hasn't changed.
+        if corpus:
+            version = self._corpus_version(corpus)
+            cached_matrix = self._load_minhash_cache(version)
+            if cached_matrix is not None:
+                self._corpus_minhash = cached_matrix
+            else:
+                self._corpus_minhash = np.stack([
+                    _minhash_signature(set(_WORD_RE.findall(entry["error_log"].lower())))
+                    for entry in corpus
+                ])
+                self._save_minhash_cache(version, self._corpus_minhash)
+        else:
+            self._corpus_minhash = np.empty((0, _MINHASH_PERMS), dtype=np.uint32)
+
+        self._corpus_signature_index = defaultdict(list)
+        for index, entry in enumerate(corpus):
+            self._corpus_signature_index[entry["signature"]].append(index)
+
+        self._similarity_corpus = corpus
+        self._corpus_loaded_at = now
+        return corpus
+
+    def _rank_candidates(self, corpus: List[Dict[str, Any]], similarities: np.ndarray,
+                         error_signature: str, repo_context: str,
+                         min_similarity: float) -> List[Dict[str, Any]]:
+        """Rank corpus entries for one query given its similarity row."""
+        # Select candidates in one vectorized pass; exact-signature rows
+        # are added back since their MinHash estimate may sit below the
+        # threshold even though they score 1.0.
+        candidate_indices = set(np.nonzero(similarities >= min_similarity)[0].tolist())
+        candidate_indices.update(self._corpus_signature_index.get(error_signature, ()))
+        if not candidate_indices:
+            return []
+
+        candidate_idx = np.fromiter(candidate_indices, dtype=np.int64,
+                                    count=len(candidate_indices))
+        adjusted = np.empty(candidate_idx.size, dtype=np.float32)
+        for pos, index in enumerate(candidate_idx):
+            entry = corpus[index]
+            similarity = 1.0 if error_signature == entry["signature"] else float(similarities[index])
+            if entry["repository"] == repo_context:
+                similarity = min(1.0, similarity + 0.2)
+            adjusted[pos] = similarity
+
+        # Partial-select the top 10 instead of sorting every candidate, and
+        # materialize result dicts only for those.
+        k = min(10, adjusted.size)
+        top = np.argpartition(-adjusted, k - 1)[:k]
+        top = top[np.argsort(-adjusted[top])]
+
         similar_fixes = []
-        
+        for pos in top:
+            entry = corpus[candidate_idx[pos]]
+            hist_error = entry["error_log"]
+            similar_fixes.append({
+                "similarity_score": float(adjusted[pos]),
+                "historical_fix": entry["fix"],
+                "repository": entry["repository"],
+                "date": entry["created"].isoformat() if entry["created"] else None,
+                "error_pattern": hist_error[:200] + "..." if len(hist_error) > 200 else hist_error
+            })
+
+        return similar_fixes
+
+    @staticmethod
+    def _corpus_version(corpus: List[Dict[str, Any]]) -> str:
+        """Version tag for the loaded corpus: row count plus newest row."""
+        newest = max((entry["created"] for entry in corpus if entry["created"]),
+                     default=None)
+        return f"{len(corpus)}:{newest.isoformat() if newest else ''}"
+
+    def _load_minhash_cache(self, version: str) -> Optional[np.ndarray]:
+        """Load the cached MinHash matrix if it matches this version."""
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-              
-                cursor.execute("""
-                    SELECT DISTINCT error_log, suggested_fix, fix_status, 
-                           repo_name, owner, created_at
-                    FROM workflow_runs 
-                    WHERE suggested_fix IS NOT NULL 
-                    AND fix_status = 'approved'
-                    AND error_log IS NOT NULL
-                    ORDER BY created_at DESC
-                    LIMIT 500
-                """)
-                
-                historical_fixes = cursor.fetchall()
-                
-            for fix_data in historical_fixes:
-                hist_error, hist_fix, status, repo, owner, created = fix_data
-                hist_signature = self.extract_error_signature(hist_error)
-                
-                similarity = self.calculate_similarity(
-                    error_signature, hist_signature, error_log, hist_error
-                )
-                
-                if similarity >= min_similarity:
-                    repo_match_bonus = 0.2 if f"{owner}/{repo}" == repo_context else 0
-                    adjusted_similarity = min(1.0, similarity + repo_match_bonus)
-                    
-                    similar_fixes.append({
-                        "similarity_score": adjusted_similarity,
-                        "historical_fix": hist_fix,
-                        "repository": f"{owner}/{repo}",
-                        "date": created.isoformat() if created else None,
-                        "error_pattern": hist_error[:200] + "..." if len(hist_error) > 200 else hist_error
-                    })
-        
-            similar_fixes.sort(key=lambda x: x["similarity_score"], reverse=True)
-            return similar_fixes[:10]
-            
+            with np.load(self._MINHASH_CACHE_FILE) as cache:
+                if str(cache["version"]) == version:
+                    return np.asarray(cache["minhash"])
+        except (OSError, KeyError, ValueError):
+            pass
+        return None
+
+    def _save_minhash_cache(self, version: str, matrix: np.ndarray):
+        """Persist the MinHash matrix so the next cold start skips hashing."""
+        try:
+            np.savez(self._MINHASH_CACHE_FILE, version=version, minhash=matrix)
+        except OSError as e:
+            logger.warning(f"Could not write MinHash cache: {e}")
+
+    def score_corpus(self, error_log: str) -> Optional[Tuple[List[Dict[str, Any]], np.ndarray, str]]:
+        """Run the similarity pass for a log once, returning raw scores.
+
+        Callers that rank the same log at several thresholds (fix
+        generation at 0.3, success prediction at 0.2) compute this once
+        and pass it back into find_similar_fixes instead of re-hashing
+        the log and re-scanning the corpus per call.
+        """
+        corpus = self._load_similarity_corpus()
+        if not corpus:
+            return None
+
+        query_minhash = _minhash_signature(set(_WORD_RE.findall(error_log.lower())))
+        similarities = _minhash_similarities(self._corpus_minhash, query_minhash)
+
+        return corpus, similarities, self.extract_error_signature(error_log)
+
+    def find_similar_fixes(self, error_log: str, repo_context: str,
+                          min_similarity: float = 0.3,
+                          scored: Optional[Tuple[List[Dict[str, Any]], np.ndarray, str]] = None
+                          ) -> List[Dict[str, Any]]:
+        """Find similar fixes based on error patterns and repository context."""
+        try:
+            if scored is None:
+                scored = self.score_corpus(error_log)
+            if scored is None:
+                return []
+
+            corpus, similarities, error_signature = scored
+            return self._rank_candidates(corpus, similarities, error_signature,
+                                         repo_context, min_similarity)
+
         except Exception as e:
             logger.error(f"Error finding similar fixes: {e}")
             return []
+
+    def find_similar_fixes_batch(self, error_logs: List[str], repo_contexts: List[str],
+                                 min_similarity: float = 0.3) -> List[List[Dict[str, Any]]]:
+        """Find similar fixes for many error logs against one corpus load.
+
+        All query MinHashes are stacked and compared to the corpus matrix in
+        a single broadcast, so N lookups cost one (N, corpus, 128) pass
+        instead of N separate scans.
+        """
+        try:
+            corpus = self._load_similarity_corpus()
+            if not corpus or not error_logs:
+                return [[] for _ in error_logs]
+
+            query_matrix = np.stack([
+                _minhash_signature(set(_WORD_RE.findall(log.lower())))
+                for log in error_logs
+            ])
+            similarity_matrix = _minhash_similarities(
+                self._corpus_minhash[None, :, :], query_matrix[:, None, :]
+            )
+
+            return [
+                self._rank_candidates(corpus, similarity_matrix[row],
+                                      self.extract_error_signature(error_log),
+                                      repo_context, min_similarity)
+                for row, (error_log, repo_context) in enumerate(zip(error_logs, repo_contexts))
+            ]
+
+        except Exception as e:
+            logger.error(f"Error finding similar fixes in batch: {e}")
+            return [[] for _ in error_logs]
     
     def learn_from_feedback(self, error_log: str, suggested_fix: str, 
                            fix_status: str, repo_context: str):
@@ -710,11 +1028,7 @@ class MLPatternRecognizer:
         error_signature = self.extract_error_signature(error_log)
         
         
-        existing_pattern = None
-        for pattern in self.learned_patterns:
-            if pattern.error_signature == error_signature:
-                existing_pattern = pattern
-                break
+        existing_pattern = self.learned_patterns.get(error_signature)
         
         if existing_pattern:
             existing_pattern.usage_count += 1
@@ -734,8 +1048,8 @@ class MLPatternRecognizer:
                 )
         
         elif fix_status == "approved":
-            
-            new_pattern = FixPattern(
+
+            existing_pattern = FixPattern(
                 error_signature=error_signature,
                 fix_template=suggested_fix,
                 success_rate=1.0,
@@ -743,99 +1057,308 @@ class MLPatternRecognizer:
                 repo_contexts={repo_context},
                 last_updated=datetime.utcnow()
             )
-            self.learned_patterns.append(new_pattern)
-        
-     
-        self.save_learned_patterns()
-    
-    def save_learned_patterns(self):
-        """Save learned patterns to database for persistence."""
+            self.learned_patterns[error_signature] = existing_pattern
+
+        # Only the touched pattern needs persisting (rejected feedback with
+        # no matching pattern changes nothing).
+        if existing_pattern:
+            self._persist_pattern(existing_pattern)
+
+    @staticmethod
+    def _ensure_patterns_table(cursor):
+        """Create the row-per-pattern table if it doesn't exist yet."""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS learned_fix_patterns (
+                error_signature TEXT PRIMARY KEY,
+                fix_template TEXT,
+                success_rate DOUBLE PRECISION,
+                usage_count INTEGER,
+                repo_contexts TEXT[],
+                last_updated TIMESTAMPTZ
+            )
+        """)
+        MLPatternRecognizer._migrate_legacy_patterns(cursor)
+
+    @staticmethod
+    def _migrate_legacy_patterns(cursor):
+        """One-time fold of the legacy JSONB blob into the new table.
+
+        Earlier versions stored the whole pattern set as a single JSONB
+        row in learned_patterns; without copying it over, a deploy would
+        silently drop every pattern learned so far. Runs only while the
+        new table is empty and never overwrites rows written since.
+        """
+        cursor.execute("SELECT 1 FROM learned_fix_patterns LIMIT 1")
+        if cursor.fetchone():
+            return
+
+        cursor.execute("SELECT to_regclass('learned_patterns')")
+        if cursor.fetchone()[0] is None:
+            return
+
+        cursor.execute("""
+            SELECT patterns_data FROM learned_patterns
+            ORDER BY updated_at DESC LIMIT 1
+        """)
+        row = cursor.fetchone()
+        if not row or not row[0]:
+            return
+
+        patterns_data = row[0] if isinstance(row[0], list) else json.loads(row[0])
+        migrated = 0
+        for item in patterns_data:
+            try:
+                last_updated = datetime.fromisoformat(item["last_updated"])
+            except (KeyError, TypeError, ValueError):
+                last_updated = datetime.utcnow()
+
+            cursor.execute("""
+                INSERT INTO learned_fix_patterns
+                (error_signature, fix_template, success_rate, usage_count, repo_contexts, last_updated)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (error_signature) DO NOTHING
+            """, (
+                item.get("error_signature"),
+                item.get("fix_template"),
+                item.get("success_rate", 0.0),
+                item.get("usage_count", 0),
+                sorted(item.get("repo_contexts") or []),
+                last_updated
+            ))
+            migrated += 1
+
+        if migrated:
+            logger.info(f"Migrated {migrated} legacy learned patterns")
+
+    def _persist_pattern(self, pattern: FixPattern):
+        """Upsert a single learned pattern.
+
+        Feedback events only touch one pattern, so write that one row with
+        ON CONFLICT instead of rewriting the whole pattern set as a blob.
+        """
         try:
-        
-            patterns_data = []
-            for pattern in self.learned_patterns:
-                patterns_data.append({
-                    "error_signature": pattern.error_signature,
-                    "fix_template": pattern.fix_template,
-                    "success_rate": pattern.success_rate,
-                    "usage_count": pattern.usage_count,
-                    "repo_contexts": list(pattern.repo_contexts),
-                    "last_updated": pattern.last_updated.isoformat()
-                })
-            
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
-                
-               
+                self._ensure_patterns_table(cursor)
+
                 cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS learned_patterns (
-                        id SERIAL PRIMARY KEY,
-                        patterns_data JSONB,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-             
-                cursor.execute("DELETE FROM learned_patterns")
-                cursor.execute(
-                    "INSERT INTO learned_patterns (patterns_data) VALUES (%s)",
-                    (json.dumps(patterns_data),)
-                )
-                
+                    INSERT INTO learned_fix_patterns
+                    (error_signature, fix_template, success_rate, usage_count, repo_contexts, last_updated)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (error_signature) DO UPDATE SET
+                        fix_template = EXCLUDED.fix_template,
+                        success_rate = EXCLUDED.success_rate,
+                        usage_count = EXCLUDED.usage_count,
+                        repo_contexts = EXCLUDED.repo_contexts,
+                        last_updated = EXCLUDED.last_updated
+                """, (
+                    pattern.error_signature,
+                    pattern.fix_template,
+                    pattern.success_rate,
+                    pattern.usage_count,
+                    sorted(pattern.repo_contexts),
+                    pattern.last_updated
+                ))
+
                 conn.commit()
-                
+
         except Exception as e:
-            logger.error(f"Error saving learned patterns: {e}")
-    
+            logger.error(f"Error saving learned pattern: {e}")
+
+    def save_learned_patterns(self):
+        """Persist every learned pattern (bulk sync of the in-memory set)."""
+        for pattern in self.learned_patterns.values():
+            self._persist_pattern(pattern)
+
     def load_learned_patterns(self):
         """Load learned patterns from database."""
         try:
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
-                
+                self._ensure_patterns_table(cursor)
+
                 cursor.execute("""
-                    SELECT patterns_data FROM learned_patterns 
-                    ORDER BY updated_at DESC LIMIT 1
+                    SELECT error_signature, fix_template, success_rate,
+                           usage_count, repo_contexts, last_updated
+                    FROM learned_fix_patterns
                 """)
-                
-                result = cursor.fetchone()
-                
-            if result:
-                patterns_data = result[0]
-                self.learned_patterns = []
-                
-                for data in patterns_data:
-                    pattern = FixPattern(
-                        error_signature=data["error_signature"],
-                        fix_template=data["fix_template"],
-                        success_rate=data["success_rate"],
-                        usage_count=data["usage_count"],
-                        repo_contexts=set(data["repo_contexts"]),
-                        last_updated=datetime.fromisoformat(data["last_updated"])
-                    )
-                    self.learned_patterns.append(pattern)
-                
+
+                rows = cursor.fetchall()
+
+            self.learned_patterns = {}
+            for signature, fix_template, success_rate, usage_count, repo_contexts, last_updated in rows:
+                self.learned_patterns[signature] = FixPattern(
+                    error_signature=signature,
+                    fix_template=fix_template,
+                    success_rate=success_rate,
+                    usage_count=usage_count,
+                    repo_contexts=set(repo_contexts or []),
+                    last_updated=last_updated
+                )
+
+            if self.learned_patterns:
                 logger.info(f"Loaded {len(self.learned_patterns)} learned patterns")
-            
+
         except Exception as e:
             logger.error(f"Error loading learned patterns: {e}")
-            self.learned_patterns = []
+            self.learned_patterns = {}
+
+
+@lru_cache(maxsize=1)
+def get_pattern_recognizer() -> MLPatternRecognizer:
+    """Shared pattern recognizer.
+
+    Construction loads the learned-pattern table from the DB, so every
+    extra instance repeats that read; the cached instance also shares its
+    similarity-corpus cache across SuccessPredictor and
+    IntelligentFixGenerator.
+    """
+    return MLPatternRecognizer()
 
 
 class SuccessPredictor:
     """
     Predicts the likelihood of fix success based on historical patterns.
     """
-    
+
+    # Repo success rates are re-requested for the same repo on every
+    # prediction; cache them briefly so repeat predictions skip the DB.
+    REPO_RATE_TTL_SECONDS = 300
+
+    # Fixed factor/weight layout so the weighted sum is one dot product.
+    _FACTOR_ORDER = ("similarity_match", "repo_history", "fix_complexity",
+                     "error_type_reliability", "time_context")
+    _FACTOR_WEIGHTS = np.array([0.3, 0.25, 0.2, 0.15, 0.1], dtype=np.float32)
+
+    _COMPLEXITY_ORDER = ("multiline_changes", "multiple_files", "code_deletion",
+                         "configuration_changes", "dependency_changes")
+    _COMPLEXITY_WEIGHTS = np.array([0.3, 0.2, 0.15, 0.2, 0.15], dtype=np.float32)
+
+    # How reliably each error type has historically been fixed.
+    _TYPE_RELIABILITY = MappingProxyType({
+        "dependency_error": 0.8,      # Usually fixable
+        "linting_error": 0.9,         # Very fixable
+        "test_failure": 0.7,          # Moderately fixable
+        "build_failure": 0.6,         # Can be complex
+        "docker_error": 0.5,          # Often complex
+        "execution_timeout": 0.4,     # Hard to fix
+        "deployment_error": 0.5       # Variable complexity
+    })
+
+    # Name-keyed view of the factor weights, shared instead of rebuilt per call.
+    _FACTOR_WEIGHT_MAP = MappingProxyType(dict(zip(_FACTOR_ORDER, _FACTOR_WEIGHTS.tolist())))
+
     def __init__(self):
-        self.db = PostgreSQLCICDFixerDB()
-        self.pattern_recognizer = MLPatternRecognizer()
+        self.db = get_db()
+        self.pattern_recognizer = get_pattern_recognizer()
+        self.pattern_analyzer = get_pattern_analyzer()
+        self._repo_rate_cache: Dict[str, Tuple[float, datetime]] = {}
     
-    def predict_fix_success(self, error_log: str, suggested_fix: str, 
-                          repo_context: str) -> Dict[str, Any]:
-        """Predict the likelihood of a fix being successful."""
+    def predict_fix_success(self, error_log: str, suggested_fix: str,
+                          repo_context: str,
+                          min_success_threshold: float = 0.0,
+                          scored: Optional[Tuple[List[Dict[str, Any]], np.ndarray, str]] = None
+                          ) -> Dict[str, Any]:
+        """Predict the likelihood of a fix being successful.
+
+        Callers that only act on predictions above a threshold can pass
+        min_success_threshold; factors are then evaluated cheapest first
+        and the corpus scan and repo-history DB hit are skipped entirely
+        once even a perfect remaining score can't reach the threshold.
+        A precomputed score_corpus result can be passed via scored to
+        avoid repeating the similarity pass done by the caller.
+        """
         try:
-           
+            weights = self._FACTOR_WEIGHT_MAP
+
+            # Classify once per prediction; every downstream factor reuses it.
+            error_types = self.pattern_analyzer._classify_error_types(error_log)
+
+            if min_success_threshold > 0.0:
+                known = (
+                    (1.0 - self._assess_fix_complexity(suggested_fix)) * weights["fix_complexity"]
+                    + self._get_error_type_reliability(error_types) * weights["error_type_reliability"]
+                    + 0.8 * weights["time_context"]
+                )
+                upper_bound = known + weights["similarity_match"] + weights["repo_history"]
+                if upper_bound < min_success_threshold:
+                    return {
+                        "predicted_success_rate": upper_bound,
+                        "confidence": 0.0,
+                        "early_exit": True
+                    }
+
+            similar_fixes = self.pattern_recognizer.find_similar_fixes(
+                error_log, repo_context, min_similarity=0.2, scored=scored
+            )
+
+            if min_success_threshold > 0.0:
+                avg_similarity = 0.0
+                if similar_fixes:
+                    avg_similarity = sum(fix["similarity_score"] for fix in similar_fixes[:5]) / min(5, len(similar_fixes))
+                upper_bound = known + avg_similarity * weights["similarity_match"] + weights["repo_history"]
+                if upper_bound < min_success_threshold:
+                    return {
+                        "predicted_success_rate": upper_bound,
+                        "confidence": 0.0,
+                        "early_exit": True
+                    }
+
+            repo_success_rate = self._get_repo_success_rate(repo_context)
+
+            return self._predict_from_parts(error_types, suggested_fix,
+                                            similar_fixes, repo_success_rate)
+
+        except Exception as e:
+            logger.error(f"Error predicting fix success: {e}")
+            return {
+                "predicted_success_rate": 0.5,
+                "confidence": 0.1,
+                "error": str(e)
+            }
+
+    def predict_fix_success_batch(self, items: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        """Predict success for many (error_log, suggested_fix, repo_context) at once.
+
+        Repo success rates are fetched in one grouped query and similarity
+        search runs as a single batched corpus pass, so N predictions cost
+        one DB round-trip instead of N.
+        """
+        if not items:
+            return []
+
+        try:
+            repo_contexts = [repo_context for _, _, repo_context in items]
+            repo_rates = self._get_repo_success_rates_batch(set(repo_contexts))
+            similar_lists = self.pattern_recognizer.find_similar_fixes_batch(
+                [error_log for error_log, _, _ in items], repo_contexts,
+                min_similarity=0.2
+            )
+
+            return [
+                self._predict_from_parts(
+                    self.pattern_analyzer._classify_error_types(error_log),
+                    suggested_fix, similar_fixes,
+                    repo_rates.get(repo_context, 0.5)
+                )
+                for (error_log, suggested_fix, repo_context), similar_fixes
+                in zip(items, similar_lists)
+            ]
+
+        except Exception as e:
+            logger.error(f"Error predicting fix success in batch: {e}")
+            return [{
+                "predicted_success_rate": 0.5,
+                "confidence": 0.1,
+                "error": str(e)
+            } for _ in items]
+
+    def _predict_from_parts(self, error_types: List[str], suggested_fix: str,
+                            similar_fixes: List[Dict[str, Any]],
+                            repo_success_rate: float) -> Dict[str, Any]:
+        """Assemble a prediction from already-fetched similarity and repo data."""
+        try:
+
             factors = {
                 "similarity_match": 0.0,
                 "repo_history": 0.0,
@@ -843,18 +1366,11 @@ class SuccessPredictor:
                 "error_type_reliability": 0.0,
                 "time_context": 0.0
             }
-            
-         
-            similar_fixes = self.pattern_recognizer.find_similar_fixes(
-                error_log, repo_context, min_similarity=0.2
-            )
-            
+
             if similar_fixes:
                 avg_similarity = sum(fix["similarity_score"] for fix in similar_fixes[:5]) / min(5, len(similar_fixes))
                 factors["similarity_match"] = avg_similarity
-            
-            
-            repo_success_rate = self._get_repo_success_rate(repo_context)
+
             factors["repo_history"] = repo_success_rate
             
            
@@ -862,25 +1378,16 @@ class SuccessPredictor:
             factors["fix_complexity"] = 1.0 - fix_complexity  
             
       
-            error_reliability = self._get_error_type_reliability(error_log)
+            error_reliability = self._get_error_type_reliability(error_types)
             factors["error_type_reliability"] = error_reliability
             
            
             factors["time_context"] = 0.8 
             
-        
-            weights = {
-                "similarity_match": 0.3,
-                "repo_history": 0.25,
-                "fix_complexity": 0.2,
-                "error_type_reliability": 0.15,
-                "time_context": 0.1
-            }
-            
-            predicted_success = sum(
-                factors[factor] * weights[factor] 
-                for factor in factors
-            )
+
+            factor_vec = np.array([factors[factor] for factor in self._FACTOR_ORDER],
+                                  dtype=np.float32)
+            predicted_success = float(factor_vec @ self._FACTOR_WEIGHTS)
             
          
             confidence = min(1.0, (
@@ -906,20 +1413,86 @@ class SuccessPredictor:
             }
     
     def _get_repo_success_rate(self, repo_context: str) -> float:
-        """Get historical success rate for the repository."""
+        """Get historical success rate for the repository (TTL-cached)."""
+        cached = self._repo_rate_cache.get(repo_context)
+        now = datetime.utcnow()
+        if cached and (now - cached[1]).total_seconds() < self.REPO_RATE_TTL_SECONDS:
+            return cached[0]
+
+        rate = self._query_repo_success_rate(repo_context)
+        self._repo_rate_cache[repo_context] = (rate, now)
+        return rate
+
+    def _get_repo_success_rates_batch(self, repo_contexts: Set[str]) -> Dict[str, float]:
+        """Get success rates for several repositories with one grouped query."""
+        now = datetime.utcnow()
+        rates: Dict[str, float] = {}
+        missing = []
+        for repo_context in repo_contexts:
+            cached = self._repo_rate_cache.get(repo_context)
+            if cached and (now - cached[1]).total_seconds() < self.REPO_RATE_TTL_SECONDS:
+                rates[repo_context] = cached[0]
+            else:
+                missing.append(repo_context)
+
+        if not missing:
+            return rates
+
+        pair_to_context = {
+            tuple(ctx.split("/")) if "/" in ctx else ("", ctx): ctx
+            for ctx in missing
+        }
+
+        try:
+            with self.db.get_connection() as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("SET LOCAL statement_timeout = 2000")
+                cursor.execute("""
+                    SELECT owner, repo_name,
+                        COUNT(CASE WHEN fix_status = 'approved' THEN 1 END) as approved,
+                        COUNT(*) as total
+                    FROM workflow_runs
+                    WHERE (owner, repo_name) IN %s
+                    AND suggested_fix IS NOT NULL
+                    AND fix_status IN ('approved', 'rejected')
+                    GROUP BY owner, repo_name
+                """, (tuple(pair_to_context.keys()),))
+
+                for owner, repo, approved, total in cursor.fetchall():
+                    repo_context = pair_to_context.get((owner, repo))
+                    if repo_context and total > 0:
+                        rates[repo_context] = approved / total
+
+        except Exception as e:
+            logger.error(f"Error getting batch repo success rates: {e}")
+
+        for repo_context in missing:
+            rates.setdefault(repo_context, 0.5)
+            self._repo_rate_cache[repo_context] = (rates[repo_context], now)
+
+        return rates
+
+    def _query_repo_success_rate(self, repo_context: str) -> float:
+        """Query the historical success rate for the repository."""
         try:
             owner, repo = repo_context.split("/") if "/" in repo_context else ("", repo_context)
             
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
-                
+
+                # Prediction-path query: keep it snappy rather than letting a
+                # slow plan stall the whole prediction. SET LOCAL scopes the
+                # timeout to this transaction, so the pooled connection is
+                # unaffected afterwards.
+                cursor.execute("SET LOCAL statement_timeout = 2000")
                 cursor.execute("""
-                    SELECT 
+                    SELECT
                         COUNT(CASE WHEN fix_status = 'approved' THEN 1 END) as approved,
                         COUNT(*) as total
-                    FROM workflow_runs 
-                    WHERE owner = %s AND repo_name = %s 
-                    AND suggested_fix IS NOT NULL 
+                    FROM workflow_runs
+                    WHERE owner = %s AND repo_name = %s
+                    AND suggested_fix IS NOT NULL
                     AND fix_status IN ('approved', 'rejected')
                 """, (owner, repo))
                 
@@ -939,50 +1512,30 @@ class SuccessPredictor:
         if not fix_text:
             return 1.0
         
+        fix_lower = fix_text.lower()
         complexity_indicators = {
-            "multiline_changes": len(fix_text.split('\n')) / 50,  # More lines = more complex
+            "multiline_changes": (fix_text.count('\n') + 1) / 50,  # More lines = more complex
             "multiple_files": fix_text.count("file:") / 10,
-            "code_deletion": fix_text.lower().count("delete") / 5,
-            "configuration_changes": len(re.findall(r'\.(json|yaml|yml|xml|config)', fix_text.lower())) / 5,
-            "dependency_changes": len(re.findall(r'(install|upgrade|add.*dependency)', fix_text.lower())) / 3
+            "code_deletion": fix_lower.count("delete") / 5,
+            "configuration_changes": len(_CONFIG_FILE_RE.findall(fix_lower)) / 5,
+            "dependency_changes": len(_DEPENDENCY_CHANGE_RE.findall(fix_lower)) / 3
         }
         
-       
-        weights = {
-            "multiline_changes": 0.3,
-            "multiple_files": 0.2,
-            "code_deletion": 0.15,
-            "configuration_changes": 0.2,
-            "dependency_changes": 0.15
-        }
-        
-        complexity = sum(
-            min(1.0, complexity_indicators[factor]) * weights[factor]
-            for factor in complexity_indicators
-        )
-        
+
+        indicator_vec = np.minimum(1.0, np.array(
+            [complexity_indicators[factor] for factor in self._COMPLEXITY_ORDER],
+            dtype=np.float32
+        ))
+        complexity = float(indicator_vec @ self._COMPLEXITY_WEIGHTS)
+
         return min(1.0, complexity)
     
-    def _get_error_type_reliability(self, error_log: str) -> float:
-        """Get reliability score for the error type based on historical fix success."""
-        analyzer = CICDPatternAnalyzer()
-        error_types = analyzer._classify_error_types(error_log)
-        
+    def _get_error_type_reliability(self, error_types: List[str]) -> float:
+        """Get reliability score for already-classified error types."""
         if not error_types:
             return 0.5
-      
-        type_reliability = {
-            "dependency_error": 0.8,      # Usually fixable
-            "linting_error": 0.9,         # Very fixable
-            "test_failure": 0.7,          # Moderately fixable
-            "build_failure": 0.6,         # Can be complex
-            "docker_error": 0.5,          # Often complex
-            "execution_timeout": 0.4,     # Hard to fix
-            "deployment_error": 0.5       # Variable complexity
-        }
-        
-        primary_type = error_types[0]
-        return type_reliability.get(primary_type, 0.5)
+
+        return self._TYPE_RELIABILITY.get(error_types[0], 0.5)
     
     def _generate_prediction_recommendations(self, factors: Dict[str, float], 
                                            predicted_success: float) -> List[str]:
@@ -1012,19 +1565,20 @@ class IntelligentFixGenerator:
     """
     
     def __init__(self):
-        self.db = PostgreSQLCICDFixerDB()
-        self.pattern_recognizer = MLPatternRecognizer()
+        self.db = get_db()
+        self.pattern_recognizer = get_pattern_recognizer()
         self.success_predictor = SuccessPredictor()
     
     def generate_enhanced_fix(self, error_log: str, repo_context: str, 
                             base_fix: str = None) -> Dict[str, Any]:
         """Generate an enhanced fix recommendation with ML insights."""
         try:
-           
+            # One similarity pass shared by generation and prediction.
+            scored = self.pattern_recognizer.score_corpus(error_log)
             similar_fixes = self.pattern_recognizer.find_similar_fixes(
-                error_log, repo_context, min_similarity=0.3
+                error_log, repo_context, min_similarity=0.3, scored=scored
             )
-            
+
           
             if similar_fixes and similar_fixes[0]["similarity_score"] > 0.7:
                
@@ -1045,7 +1599,7 @@ class IntelligentFixGenerator:
             
           
             prediction = self.success_predictor.predict_fix_success(
-                error_log, recommended_fix, repo_context
+                error_log, recommended_fix, repo_context, scored=scored
             )
             
             return {
@@ -1072,72 +1626,73 @@ class IntelligentFixGenerator:
         """Adapt a historical fix to the current context."""
       
         adapted_fix = historical_fix
-        
-     
+
+
         if "/" in repo_context:
             owner, repo = repo_context.split("/")
             adapted_fix = adapted_fix.replace("<repo>", repo).replace("<owner>", owner)
-        
-        
-        adaptation_note = f"\n\n# Adapted from similar fix in repository context\n# Original success rate: High\n# Context: {repo_context}"
-        
-        return adapted_fix + adaptation_note
+
+        return "".join([
+            adapted_fix,
+            "\n\n# Adapted from similar fix in repository context",
+            "\n# Original success rate: High",
+            f"\n# Context: {repo_context}"
+        ])
     
     def _enhance_base_fix(self, base_fix: str, similar_fixes: List[Dict]) -> str:
         """Enhance a base fix with insights from similar fixes."""
-        enhanced_fix = base_fix
-        
-        if similar_fixes:
-            enhancement_note = f"\n\n# Enhanced with insights from {len(similar_fixes)} similar cases\n"
-            enhancement_note += "# Additional considerations based on historical patterns:\n"
-            
-            for i, fix in enumerate(similar_fixes[:2]):
-                enhancement_note += f"# {i+1}. From {fix['repository']} (similarity: {fix['similarity_score']:.2f})\n"
-            
-            enhanced_fix += enhancement_note
-        
-        return enhanced_fix
+        if not similar_fixes:
+            return base_fix
+
+        parts = [
+            base_fix,
+            f"\n\n# Enhanced with insights from {len(similar_fixes)} similar cases\n",
+            "# Additional considerations based on historical patterns:\n"
+        ]
+        parts.extend(
+            f"# {i+1}. From {fix['repository']} (similarity: {fix['similarity_score']:.2f})\n"
+            for i, fix in enumerate(similar_fixes[:2])
+        )
+
+        return "".join(parts)
     
     def _generate_from_patterns(self, error_log: str, similar_fixes: List[Dict]) -> str:
         """Generate a fix based on learned patterns."""
         if not similar_fixes:
             return "# No similar patterns found\n# Manual investigation recommended\n# Check error logs and repository documentation"
         
-     
-        pattern_fix = "# Generated from similar patterns:\n\n"
-        
-        
-        common_patterns = []
+
+        parts = ["# Generated from similar patterns:\n\n"]
+
+
+        # Ordered dedup via dict keys; stop scanning at five unique commands.
+        common_patterns: Dict[str, None] = {}
         for fix in similar_fixes[:3]:
-            lines = fix["historical_fix"].split('\n')
-            for line in lines:
-                if any(cmd in line.lower() for cmd in ['npm', 'pip', 'apt', 'yarn', 'mvn', 'gradle']):
-                    common_patterns.append(line.strip())
-        
+            for line in fix["historical_fix"].splitlines():
+                # One case-insensitive regex pass per line instead of six
+                # lowered substring scans.
+                if _CMD_RE.search(line):
+                    common_patterns.setdefault(line.strip())
+                    if len(common_patterns) >= 5:
+                        break
+            if len(common_patterns) >= 5:
+                break
+
         if common_patterns:
-            pattern_fix += "# Common fix patterns identified:\n"
-            for pattern in set(common_patterns[:5]): 
-                pattern_fix += f"# {pattern}\n"
-        
-        pattern_fix += "\n# Recommended action based on patterns:\n"
-        pattern_fix += "# 1. Review the error log for specific failure points\n"
-        pattern_fix += "# 2. Check dependency versions and compatibility\n"
-        pattern_fix += "# 3. Verify configuration files\n"
-        
-        return pattern_fix
+            parts.append("# Common fix patterns identified:\n")
+            parts.extend(f"# {pattern}\n" for pattern in common_patterns)
+
+        parts.append("\n# Recommended action based on patterns:\n")
+        parts.append("# 1. Review the error log for specific failure points\n")
+        parts.append("# 2. Check dependency versions and compatibility\n")
+        parts.append("# 3. Verify configuration files\n")
+
+        return "".join(parts)
     
     def _assess_confidence_level(self, confidence_score: float) -> str:
         """Convert confidence score to human-readable level."""
-        if confidence_score >= 0.8:
-            return "Very High"
-        elif confidence_score >= 0.6:
-            return "High"
-        elif confidence_score >= 0.4:
-            return "Medium"
-        elif confidence_score >= 0.2:
-            return "Low"
-        else:
-            return "Very Low"
+        return next((label for threshold, label in _CONFIDENCE_BUCKETS
+                     if confidence_score >= threshold), "Very Low")
     
     def _generate_enhancement_notes(self, strategy: str, similar_fixes: List[Dict]) -> List[str]:
         """Generate notes about the enhancement process."""
@@ -6,78 +6,169 @@ This ensures we have all the real failure data that users expect to see.
 
 import os
 import sys
+import json
+import time
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter, Retry
 from datetime import datetime
 from postgres_database import PostgreSQLCICDFixerDB
 
 backend_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, backend_dir)
 
-def get_workflow_failures(owner: str, repo: str, per_page: int = 50):
-    """Get all failed workflow runs from a GitHub repository."""
+# ETags from previous runs, so unchanged repositories answer with an empty
+# 304 instead of re-sending every page.
+_ETAG_FILE = os.path.join(backend_dir, ".backfill_etags.json")
+_etag_lock = threading.Lock()
+
+def _make_session() -> requests.Session:
+    """Build a session with retries so transient GitHub errors don't abort a page."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16,
+                                          max_retries=retry))
+
+    session.headers["Accept"] = "application/vnd.github+json"
+    token = os.getenv("GITHUB_TOKEN")
+    if token:
+        # Authenticated requests get the 5000/hr rate limit.
+        session.headers["Authorization"] = f"Bearer {token}"
+
+    return session
+
+# One shared session keeps TCP+TLS connections alive across repositories.
+_SESSION = _make_session()
+
+def _load_etags() -> dict:
+    try:
+        with open(_ETAG_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_etag(repo_key: str, etag: str):
+    with _etag_lock:
+        etags = _load_etags()
+        etags[repo_key] = etag
+        try:
+            with open(_ETAG_FILE, "w") as f:
+                json.dump(etags, f)
+        except OSError as e:
+            print(f"⚠️  Could not persist ETag cache: {e}")
+
+def _check_rate_limit(response: requests.Response):
+    """Sleep until the rate-limit window resets when we're nearly exhausted."""
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    if remaining is None or int(remaining) >= 10:
+        return
+
+    reset_at = int(response.headers.get("X-RateLimit-Reset", 0))
+    wait_seconds = max(0, reset_at - int(time.time())) + 1
+    print(f"⏳ GitHub rate limit nearly exhausted, waiting {wait_seconds}s...")
+    time.sleep(wait_seconds)
+
+def get_workflow_failures(owner: str, repo: str, per_page: int = 100):
+    """Yield all failed workflow runs from a GitHub repository, page by page.
+
+    Follows the Link header instead of stopping at one page, so larger
+    histories are covered without holding every page in memory at once.
+    """
     url = f"https://api.github.com/repos/{owner}/{repo}/actions/runs"
     params = {
         "status": "failure",
         "per_page": per_page
     }
-    
+
+    repo_key = f"{owner}/{repo}"
+    # Conditional GET on the first page: a 304 means no new runs since the
+    # last backfill, so the whole repository can be skipped body-free.
+    headers = {}
+    etag = _load_etags().get(repo_key)
+    if etag:
+        headers["If-None-Match"] = etag
+
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("workflow_runs", [])
+        first_page = True
+        new_etag = None
+        while url:
+            response = _SESSION.get(url, params=params, headers=headers)
+            if first_page and response.status_code == 304:
+                print(f"⏭️  No new workflow runs for {repo_key} (ETag match)")
+                return
+            response.raise_for_status()
+
+            if first_page:
+                new_etag = response.headers.get("ETag")
+                first_page = False
+                headers = {}
+
+            data = response.json()
+            yield from data.get("workflow_runs", [])
+
+            _check_rate_limit(response)
+            url = response.links.get("next", {}).get("url")
+            params = None  # the next URL already carries the query string
+
+        # Persist the ETag only after every page has been yielded: saving
+        # it on the first page would make an interrupted pagination look
+        # complete, and the next backfill's 304 would skip the runs that
+        # were never fetched.
+        if new_etag:
+            _save_etag(repo_key, new_etag)
     except Exception as e:
         print(f"Error fetching workflow runs for {owner}/{repo}: {e}")
-        return []
 
 def backfill_repository_failures(db: PostgreSQLCICDFixerDB, owner: str, repo: str):
     """Backfill all missing workflow failures for a repository."""
     print(f"🔍 Checking failures for {owner}/{repo}...")
-    
-    workflow_runs = get_workflow_failures(owner, repo)
-    
+
+    workflow_runs = list(get_workflow_failures(owner, repo))
+
     if not workflow_runs:
         print(f"❌ No failed workflows found for {owner}/{repo}")
         return 0
-    
+
     print(f"📋 Found {len(workflow_runs)} failed workflow runs")
-    
-    added_count = 0
-    
+
+    # One bulk existence query instead of a round-trip per run.
+    existing_ids = db.get_existing_run_ids(
+        owner, repo, [run.get("id") for run in workflow_runs]
+    )
+
+    new_rows = []
     for run in workflow_runs:
         run_id = run.get("id")
-        workflow_name = run.get("name", "Unknown Workflow")
-        conclusion = run.get("conclusion", "failure")
-        status = run.get("status", "completed")
-        created_at = run.get("created_at")
-        head_sha = run.get("head_sha", "")
-        head_branch = run.get("head_branch", "main")
-        
-        existing = db.get_workflow_run_by_run_id(repo, owner, run_id)
-        if existing:
+
+        if run_id in existing_ids:
             print(f"⏭️  Run {run_id} already exists, skipping...")
             continue
-        
-        run_data = {
+
+        conclusion = run.get("conclusion", "failure")
+        new_rows.append({
             'repo_name': repo,
             'owner': owner,
             'run_id': run_id,
-            'workflow_name': workflow_name,
-            'status': status,
+            'workflow_name': run.get("name", "Unknown Workflow"),
+            'status': run.get("status", "completed"),
             'conclusion': conclusion,
             'error_log': f"Workflow failed with conclusion: {conclusion}"
-        }
-        
-        try:
-            result = db.insert_workflow_run(run_data)
-            if result and result != -1:
-                print(f"✅ Added failure: {workflow_name} (Run {run_id})")
-                added_count += 1
-            else:
-                print(f"❌ Failed to add run {run_id}")
-        except Exception as e:
-            print(f"❌ Error adding run {run_id}: {e}")
-    
+        })
+
+    if not new_rows:
+        return 0
+
+    try:
+        # Rows were already deduplicated against the DB above, so they can
+        # take the COPY fast path.
+        added_count = db.copy_workflow_runs(new_rows)
+        for row in new_rows[:added_count]:
+            print(f"✅ Added failure: {row['workflow_name']} (Run {row['run_id']})")
+    except Exception as e:
+        print(f"❌ Error adding runs for {owner}/{repo}: {e}")
+        return 0
+
     return added_count
 
 def main():
@@ -96,25 +187,27 @@ def main():
         ]
         
         total_added = 0
-        
-        for owner, repo in repositories:
-            added = backfill_repository_failures(db, owner, repo)
-            total_added += added
-            print(f"📊 Added {added} failures for {owner}/{repo}")
-            print("-" * 50)
+
+        # Backfill is dominated by GitHub HTTP round-trips, so fan out
+        # across repositories; 8 workers stays well inside the rate limit.
+        with ThreadPoolExecutor(max_workers=min(8, len(repositories))) as executor:
+            futures = {
+                executor.submit(backfill_repository_failures, db, owner, repo): (owner, repo)
+                for owner, repo in repositories
+            }
+            for future in as_completed(futures):
+                owner, repo = futures[future]
+                added = future.result()
+                total_added += added
+                print(f"📊 Added {added} failures for {owner}/{repo}")
+                print("-" * 50)
         
         print(f"🎉 Backfill complete! Added {total_added} total failures")
         
-        all_failures = db.get_workflow_runs()
-        print(f"📈 Database now contains {len(all_failures)} total failures")
-        
-        repo_counts = {}
-        for failure in all_failures:
-            repo_key = f"{failure.get('owner', 'unknown')}/{failure.get('repo_name', 'unknown')}"
-            repo_counts[repo_key] = repo_counts.get(repo_key, 0) + 1
-        
+        print(f"📈 Database now contains {db.count_workflow_runs()} total failures")
+
         print("\n📊 Failures by repository:")
-        for repo, count in sorted(repo_counts.items()):
+        for repo, count in db.get_repo_failure_counts():
             print(f"  {repo}: {count} failures")
             
     except Exception as e:
@@ -1,19 +1,884 @@
+import asyncio
+import copy
+import hashlib
 import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache
+import logging
+import httpx
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai import types
-from google.genai import types
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import json
+import orjson
+
+from github_service import GitHubService
+
+logger = logging.getLogger(__name__)
+
+# Transport failures the Gemini client can surface: the SDK speaks HTTP
+# through httpx, so DNS errors and connect/read timeouts arrive as
+# httpx.TransportError rather than the builtin OSError family.
+_NETWORK_ERRORS = (httpx.TransportError, TimeoutError, ConnectionError, OSError)
+
+# Normalization patterns for analysis-cache keys: ANSI sequences,
+# timestamps and run-specific counters vary between otherwise-identical
+# failures, so they are stripped before hashing.
+_ANSI_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+_TIMESTAMP_RE = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?Z?')
+_HEX_ID_RE = re.compile(r'\b[0-9a-f]{7,40}\b')
+_NUMBER_RE = re.compile(r'\d+')
+
+# Project-type markers fused into one case-insensitive alternation: a single
+# linear scan collects every ecosystem present, replacing the per-call
+# .lower() copy and the stack of any(keyword in ...) passes.
+_PROJECT_MARKER_RE = re.compile(
+    r"(?P<node>npm|yarn|package\.json|node_modules)"
+    r"|(?P<next_react>next|react)"
+    r"|(?P<vue>vue)"
+    r"|(?P<angular>angular)"
+    r"|(?P<python>pip|python|requirements\.txt|pyproject\.toml)"
+    r"|(?P<django>django)"
+    r"|(?P<flask>flask)"
+    r"|(?P<fastapi>fastapi)"
+    r"|(?P<docker>docker|dockerfile|container)"
+    r"|(?P<java>maven|gradle|java)"
+    r"|(?P<rust>cargo|rust)"
+    r"|(?P<go>go mod|golang)"
+    r"|(?P<dotnet>\.net|dotnet|csharp)",
+    re.IGNORECASE,
+)
+
+_FRONTEND_REPO_TOKENS = ('react', 'next', 'vue', 'angular')
+_BACKEND_REPO_TOKENS = ('api', 'backend', 'server')
+
+# Detection results memoized per (log digest, repo name): retries and the
+# fallback path re-detect on the same logs, and the scan is pure w.r.t. its
+# inputs, so the repeat passes are pure waste.
+_PROJECT_TYPE_CACHE_MAX = 256
+_project_type_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_project_type_lock = threading.Lock()
+
+# Fallback-analyzer routing markers fused into one alternation: a single
+# linear scan over the logs collects every marker present, and the router
+# decides from the hit set. The fallback path runs on every Gemini outage,
+# so it should not re-scan a large log once per category.
+_FALLBACK_ROUTE_RE = re.compile(
+    r"(?P<npm>npm err|yarn error)"
+    r"|(?P<docker>docker)"
+    r"|(?P<build_push>build|push)"
+    r"|(?P<test>test)"
+    r"|(?P<fail>failed|error)"
+    r"|(?P<python>python|pip)",
+    re.IGNORECASE,
+)
+_FALLBACK_ROUTE_COUNT = _FALLBACK_ROUTE_RE.groups
+_PEER_DEP_RE = re.compile(r'peer dep missing', re.IGNORECASE)
+
+# Structured block in Gemini replies.
+_JSON_BLOCK_RE = re.compile(r'```json\n(.*?)\n```', re.DOTALL)
+
+# Lines worth keeping when an oversized log has to be cut down.
+_ERROR_LINE_RE = re.compile(r'error|exception|traceback|failed', re.IGNORECASE)
+
+
+def _truncate_logs(logs: str, max_chars: int = 8000) -> str:
+    """Bound a log to head + error-bearing lines + tail.
+
+    Full GitHub Actions logs can run to megabytes, blowing past the
+    model's input limit and wasting tokens. The head and tail carry
+    setup and the final failure; the middle is kept only where lines
+    match the error pattern.
+    """
+    if len(logs) <= max_chars:
+        return logs
+
+    head = logs[:2000]
+    tail = logs[-2000:]
+
+    error_lines = "\n".join(
+        line for line in logs.splitlines() if _ERROR_LINE_RE.search(line)
+    )
+    # Keep the most recent error lines within the remaining budget.
+    error_budget = max_chars - len(head) - len(tail) - 60
+    error_lines = error_lines[-error_budget:]
+
+    return f"{head}\n...[truncated]...\n{error_lines}\n...[truncated]...\n{tail}"
+
+
+def _extract_json_block(response_text: str) -> Optional[str]:
+    """Locate the structured payload in a Gemini reply.
+
+    Tries the fenced ```json block first; when the model omits the fence,
+    a brace-counting scan (string- and escape-aware) recovers the first
+    complete object instead of giving up on the whole response.
+    """
+    match = _JSON_BLOCK_RE.search(response_text)
+    if match:
+        return match.group(1)
+
+    start = response_text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(response_text)):
+        ch = response_text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return response_text[start:i + 1]
+    return None
+
+
+# Static analysis-prompt skeleton, parsed once at import; only the dynamic
+# fields are substituted per call. JSON braces are doubled for .format().
+_PROMPT_TEMPLATE = """
+You are an expert CI/CD engineer and DevOps specialist with deep knowledge of {project_type} projects. 
+Analyze the following failed CI/CD pipeline and provide a comprehensive, actionable fix.
+
+## Repository Context:
+- Repository: {repo_name}
+- Owner: {owner}
+- Workflow: {workflow_name}
+- Status: {status}
+- Run ID: {run_id}
+- Detected Project Type: {project_type}
+
+## Error Logs Analysis:
+```
+{error_logs}
+```
+
+## Language-Specific Context:
+{language_hints}
+
+## Advanced Analysis Instructions:
+1. **Error Classification**: Identify the specific error category and root cause
+2. **Context Awareness**: Consider the project type and common patterns
+3. **Actionable Solutions**: Provide specific, implementable fixes
+4. **Risk Assessment**: Evaluate the safety and complexity of the fix
+5. **Prevention Strategy**: Suggest measures to prevent similar issues
+
+## Required Analysis Output:
+
+Please provide your analysis in the following JSON format:
+
+```json
+{{
+    "error_type": "category of error (e.g., dependency_conflict, build_failure, test_failure, etc.)",
+    "root_cause": "clear explanation of what caused the failure",
+    "severity": "high|medium|low",
+    "confidence": "high|medium|low - how confident you are in this analysis",
+    "suggested_fix": {{
+        "description": "human-readable description of the fix",
+        "steps": [
+            "step 1: detailed action to take",
+            "step 2: another action",
+            "..."
+        ],
+        "files_to_modify": [
+            {{
+                "file": "path/to/file",
+                "changes": "description of changes needed"
+            }}
+        ],
+        "commands_to_run": [
+            "command 1",
+            "command 2"
+        ]
+    }},
+    "prevention": "how to prevent this issue in the future",
+    "estimated_fix_time": "estimated time to implement the fix (e.g., '5 minutes', '1 hour')",
+    "risk_level": "low|medium|high - risk of implementing this fix"
+}}
+```
+
+Focus on providing actionable, specific fixes. If you see dependency issues, suggest exact version numbers. If you see configuration problems, provide the exact configuration changes needed.
+"""
+
+
+# Per-ecosystem hint text, built once at import instead of re-parsing
+# several KB of string literals on every prompt build.
+_LANG_HINTS: Dict[str, str] = {
+    "Next.js/React": """
+Common Next.js/React Issues:
+- Node version compatibility (check .nvmrc or package.json engines)
+- Package.json dependency conflicts and peer dependencies
+- Build errors due to TypeScript configuration
+- Memory issues during build (increase NODE_OPTIONS=--max-old-space-size)
+- Environment variable configuration (.env files)
+- Static generation errors and API route issues
+    """,
+    
+    "Node.js/JavaScript": """
+Common Node.js Issues:
+- npm/yarn dependency resolution conflicts
+- Node version mismatches between local and CI
+- Package-lock.json vs yarn.lock inconsistencies
+- Missing global packages or CLI tools
+- File system permission issues
+- Memory and timeout issues in CI
+    """,
+    
+    "Python": """
+Common Python Issues:
+- Python version compatibility (check pyproject.toml or runtime.txt)
+- pip dependency conflicts and version pinning
+- Missing system dependencies for compiled packages
+- Virtual environment activation issues
+- Path and PYTHONPATH configuration
+- Requirements.txt vs setup.py vs pyproject.toml conflicts
+    """,
+    
+    "Django/Python": """
+Common Django Issues:
+- Database migration conflicts
+- Static files collection errors (STATIC_ROOT configuration)
+- Missing environment variables for settings
+- Database connection string issues
+- Collectstatic permission problems
+- Requirements for production vs development
+    """,
+    
+    "Docker/Containerized": """
+Common Docker Issues:
+- Base image availability and version pinning
+- COPY/ADD path issues and file permissions
+- Multi-stage build layer caching problems
+- Resource limits (memory, disk space)
+- Network connectivity during build
+- Secret management and environment variables
+    """,
+    
+    "Java/JVM": """
+Common Java Issues:
+- Java version compatibility (check pom.xml or build.gradle)
+- Maven/Gradle dependency conflicts
+- Memory configuration (heap size, PermGen)
+- Test execution timeouts
+- Resource file path issues
+- Plugin version compatibility
+    """
+}
+
+_GENERIC_HINTS = """
+General CI/CD Issues:
+- Environment variable configuration
+- File permissions and path issues
+- Resource constraints (memory, disk, CPU)
+- Network connectivity problems
+- Cache invalidation needs
+- Tool version mismatches
+        """
+
+
+
+# Canned fallback analyses, built once at import. The rule-based path
+# returned the same ~20-node dict literals on every call; analyzers now
+# hand out deep copies of these constants because callers mutate the
+# result (analyze_ci_failure .update()s it and the caches hold it).
+_PEER_DEP_FALLBACK: Dict[str, Any] = {
+        "error_type": "dependency_conflict",
+        "root_cause": "Missing peer dependency detected in npm/yarn installation",
+        "severity": "medium",
+        "confidence": "high",
+        "suggested_fix": {
+            "description": "Install missing peer dependencies",
+            "steps": [
+                "Identify the missing peer dependency from the error message",
+                "Install the required peer dependency with correct version",
+                "Update package.json to include the peer dependency"
+            ],
+            "files_to_modify": [
+                {
+                    "file": "package.json",
+                    "changes": "Add missing peer dependency to dependencies or peerDependencies"
+                }
+            ],
+            "commands_to_run": [
+                "npm install <missing-package>@<version>",
+                "npm audit fix"
+            ]
+        },
+        "prevention": "Use npm ls --depth=0 to check for peer dependency warnings before committing",
+        "estimated_fix_time": "10 minutes",
+        "risk_level": "low"
+    }
+
+_DOCKER_FALLBACK: Dict[str, Any] = {
+    "error_type": "docker_build_failure",
+    "root_cause": "Docker build or push operation failed",
+    "severity": "high",
+    "confidence": "medium",
+    "suggested_fix": {
+        "description": "Fix Docker build configuration",
+        "steps": [
+            "Check Dockerfile syntax and commands",
+            "Verify base image availability",
+            "Check for file permission issues",
+            "Ensure all required files are copied into the image"
+        ],
+        "files_to_modify": [
+            {
+                "file": "Dockerfile",
+                "changes": "Review and fix Dockerfile configuration"
+            }
+        ],
+        "commands_to_run": [
+            "docker build . --no-cache",
+            "docker run --rm -it <image> sh"
+        ]
+    },
+    "prevention": "Test Docker builds locally before pushing",
+    "estimated_fix_time": "30 minutes",
+    "risk_level": "medium"
+}
+
+_TEST_FALLBACK: Dict[str, Any] = {
+    "error_type": "test_failure",
+    "root_cause": "One or more tests are failing",
+    "severity": "high",
+    "confidence": "high",
+    "suggested_fix": {
+        "description": "Fix failing tests",
+        "steps": [
+            "Run tests locally to reproduce the failure",
+            "Review test cases and fix the underlying code issues",
+            "Update test expectations if business logic has changed",
+            "Ensure test environment matches CI environment"
+        ],
+        "files_to_modify": [],
+        "commands_to_run": [
+            "npm test",
+            "npm run test:watch"
+        ]
+    },
+    "prevention": "Run full test suite before pushing changes",
+    "estimated_fix_time": "1 hour",
+    "risk_level": "medium"
+}
+
+_PYTHON_FALLBACK: Dict[str, Any] = {
+    "error_type": "python_dependency_error",
+    "root_cause": "Python package installation or import error",
+    "severity": "medium",
+    "confidence": "medium",
+    "suggested_fix": {
+        "description": "Fix Python dependency issues",
+        "steps": [
+            "Check requirements.txt for correct package versions",
+            "Verify Python version compatibility",
+            "Update pip and setuptools",
+            "Clear pip cache if needed"
+        ],
+        "files_to_modify": [
+            {
+                "file": "requirements.txt",
+                "changes": "Update package versions or add missing packages"
+            }
+        ],
+        "commands_to_run": [
+            "pip install --upgrade pip",
+            "pip install -r requirements.txt"
+        ]
+    },
+    "prevention": "Use virtual environments and pin exact package versions",
+    "estimated_fix_time": "20 minutes",
+    "risk_level": "low"
+}
+
+_NPM_FALLBACK: Dict[str, Any] = {
+    "error_type": "npm_build_failure",
+    "root_cause": "NPM installation or build process failed",
+    "severity": "medium",
+    "confidence": "medium",
+    "suggested_fix": {
+        "description": "Fix NPM build issues",
+        "steps": [
+            "Clear npm cache: npm cache clean --force",
+            "Delete node_modules and package-lock.json",
+            "Reinstall dependencies: npm install",
+            "Check for Node.js version compatibility"
+        ],
+        "files_to_modify": [],
+        "commands_to_run": [
+            "npm cache clean --force",
+            "rm -rf node_modules package-lock.json",
+            "npm install"
+        ]
+    },
+    "prevention": "Use exact Node.js and npm versions in CI",
+    "estimated_fix_time": "15 minutes",
+    "risk_level": "low"
+}
+
+_GENERIC_FALLBACK: Dict[str, Any] = {
+    "error_type": "general_build_failure",
+    "root_cause": "Build process failed - requires manual investigation",
+    "severity": "medium",
+    "confidence": "low",
+    "suggested_fix": {
+        "description": "Investigate and fix build failure",
+        "steps": [
+            "Review the complete error logs carefully",
+            "Check recent code changes that might have caused the issue",
+            "Verify all configuration files are correct",
+            "Test the build process locally",
+            "Check for environment-specific issues"
+        ],
+        "files_to_modify": [],
+        "commands_to_run": [
+            "# Run build locally to reproduce the issue",
+            "# Check git log for recent changes"
+        ]
+    },
+    "prevention": "Implement comprehensive testing and code review processes",
+    "estimated_fix_time": "1 hour",
+    "risk_level": "medium"
+}
+
+
+@lru_cache(maxsize=1)
+def _persistent_db():
+    """Handle on the Postgres-backed gemini_cache table.
+
+    Imported lazily so the agent keeps working in deployments where the
+    database layer (or psycopg2) is unavailable; callers treat None as
+    "no persistent tier".
+    """
+    try:
+        from postgres_database import PostgreSQLCICDFixerDB
+        return PostgreSQLCICDFixerDB()
+    except Exception as e:
+        logger.warning("Persistent Gemini cache unavailable: %s", e)
+        return None
+
+
+class _RateLimiter:
+    """Sliding-window request/token budget for the Gemini API.
+
+    Google AI enforces per-minute request and token quotas; sleeping
+    before a call that would exceed them avoids burning a round-trip
+    just to receive a 429.
+    """
+
+    def __init__(self, rpm: int = 60, tpm: int = 100_000, window: float = 60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._requests: deque = deque()
+        self._tokens: deque = deque()
+        self._token_total = 0
+        self._lock = threading.Lock()
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        cutoff = now - self.window
+        while self._requests and self._requests[0] <= cutoff:
+            self._requests.popleft()
+        while self._tokens and self._tokens[0][0] <= cutoff:
+            self._token_total -= self._tokens.popleft()[1]
+
+        wait = 0.0
+        if len(self._requests) >= self.rpm:
+            wait = max(wait, self._requests[0] + self.window - now)
+        if self._token_total + tokens > self.tpm and self._tokens:
+            wait = max(wait, self._tokens[0][0] + self.window - now)
+        return wait
+
+    def _commit(self, tokens: int, now: float):
+        self._requests.append(now)
+        self._tokens.append((now, tokens))
+        self._token_total += tokens
+
+    def acquire(self, tokens: int):
+        """Block until the request fits inside the sliding window."""
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._wait_time(tokens, now)
+                if wait <= 0:
+                    self._commit(tokens, now)
+                    return
+            time.sleep(min(wait, 5.0))
+
+    async def acquire_async(self, tokens: int):
+        """Async variant; yields the event loop while waiting."""
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._wait_time(tokens, now)
+                if wait <= 0:
+                    self._commit(tokens, now)
+                    return
+            await asyncio.sleep(min(wait, 5.0))
+
+
+class _CircuitBreaker:
+    """Fail-fast gate around the Gemini API for sustained outages.
+
+    While the provider is healthy every call flows through (closed).
+    After fail_threshold consecutive failures the breaker opens and
+    callers skip straight to the rule-based fallback instead of eating
+    the full retry ladder per request. Once reset_after seconds have
+    passed a single probe call is let through (half-open); its success
+    closes the breaker, its failure re-opens it for another cooldown.
+
+    The lock is held only for counter updates, so sharing it between
+    the sync and async paths is safe.
+    """
+
+    def __init__(self, fail_threshold: int = 5, reset_after: float = 60.0):
+        self.fail_threshold = fail_threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may go out; reserves the half-open probe slot."""
+        with self._lock:
+            if self._failures < self.fail_threshold:
+                return True
+            if self._probing:
+                return False
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._failures >= self.fail_threshold:
+                self._opened_at = time.monotonic()
+
 
 class GeminiFixerAgent:
+
+    MODEL = "gemini-2.5-pro"
+
+    # Provider-side prompt-cache TTL; handles are refreshed shortly before
+    # Gemini expires them.
+    PROMPT_CACHE_TTL_SECONDS = 300
+
+    # Explicit caching has a provider-side minimum content size (4096
+    # tokens on gemini-2.5-pro); shorter prefixes are rejected outright,
+    # so attempting to register them only wastes a round-trip.
+    PROMPT_CACHE_MIN_TOKENS = 4096
+
+    # Concurrent in-flight Gemini calls on the async path; bounded so batch
+    # analysis does not slam the provider's rate limit.
+    MAX_CONCURRENT_CALLS = 8
+
+    # Transient provider statuses worth retrying; 4xx client errors are not.
+    RETRYABLE_STATUSES = (429, 500, 503, 504)
+
+    # Parsed-analysis LRU size; entries are small dicts, so 1000 recent
+    # failures fit comfortably in memory.
+    ANALYSIS_CACHE_MAX = 1000
+
+    # Log-template cache: recurring failure shapes matched by wildcarded
+    # patterns, checked most-frequent-first.
+    TEMPLATE_CACHE_MAX = 200
+    TEMPLATE_SORT_EVERY = 32
+
+    # Batch-job polling cadence and the states that end a job's life.
+    BATCH_POLL_INITIAL = 10.0
+    BATCH_POLL_CAP = 300.0
+    BATCH_TERMINAL_STATES = frozenset({
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+    })
+
+    # One genai.Client per API key, shared by every agent instance in the
+    # process so analyses reuse the client's keepalive connections instead
+    # of paying a TCP/TLS handshake per instantiation.
+    _client_cache: Dict[str, Any] = {}
+    _client_cache_lock = threading.Lock()
+
+    @classmethod
+    def _shared_client(cls, api_key: str):
+        with cls._client_cache_lock:
+            client = cls._client_cache.get(api_key)
+            if client is None:
+                client = genai.Client(
+                    api_key=api_key,
+                    http_options=types.HttpOptions(timeout=30_000),
+                )
+                cls._client_cache[api_key] = client
+            return client
+
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+        self._prompt_caches: Dict[str, Tuple[Any, float]] = {}
+        self._sem = asyncio.Semaphore(self.MAX_CONCURRENT_CALLS)
+        # Sticky generate_content payload shape; flipped once if the SDK
+        # rejects the structured form (see _contents_for).
+        self._plain_contents = False
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "3"))
+        self.retry_base = 1.0
+        self.retry_cap = 30.0
+        self.retry_jitter = 0.2
+        self._rate_limiter = _RateLimiter()
+        self._breaker = _CircuitBreaker(fail_threshold=5, reset_after=60.0)
+        self._analysis_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
+        # Entries are [pattern, hit_count, result]; kept roughly sorted by
+        # hit frequency so the common failure shapes match first.
+        self._template_cache: List[List[Any]] = []
+        self._template_lock = threading.Lock()
+        self._template_ops = 0
         if self.api_key:
-            self.client = genai.Client(api_key=self.api_key)
+            self.client = self._shared_client(self.api_key)
         else:
             self.client = None
-            print("Warning: No Gemini API key provided. Using fallback analysis.")
-    
+            logger.warning("No Gemini API key provided. Using fallback analysis.")
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Decide whether a Gemini failure is worth retrying.
+
+        Rate limits and server-side errors clear up on their own; auth and
+        malformed-request errors never do. Errors without a status code
+        (connection resets, timeouts) are treated as transient.
+        """
+        code = getattr(error, "code", None) or getattr(error, "status_code", None)
+        if code is None:
+            return True
+        try:
+            return int(code) in self.RETRYABLE_STATUSES
+        except (TypeError, ValueError):
+            return True
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter, capped so waits stay bounded."""
+        jitter = 1 + random.uniform(-self.retry_jitter, self.retry_jitter)
+        return min(self.retry_base * (2 ** attempt) * jitter, self.retry_cap)
+
+    @staticmethod
+    def _estimate_tokens(contents: Any) -> int:
+        """Rough token estimate: ~4 chars/token plus the output budget."""
+        return len(str(contents)) // 4 + 2048
+
+    def _call_gemini_with_retry(self, **kwargs):
+        """generate_content with backoff on transient provider errors."""
+        tokens = self._estimate_tokens(kwargs.get("contents", ""))
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._rate_limiter.acquire(tokens)
+                return self.client.models.generate_content(**kwargs)
+            except Exception as e:
+                if not self._is_retryable(e) or attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning("Retryable Gemini error (attempt %d): %s; retrying in %.1fs", attempt + 1, e, delay)
+                time.sleep(delay)
+
+    async def _call_gemini_with_retry_async(self, **kwargs):
+        """Async generate_content with the same backoff policy."""
+        tokens = self._estimate_tokens(kwargs.get("contents", ""))
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._rate_limiter.acquire_async(tokens)
+                return await self.client.aio.models.generate_content(**kwargs)
+            except Exception as e:
+                if not self._is_retryable(e) or attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning("Retryable Gemini error (attempt %d): %s; retrying in %.1fs", attempt + 1, e, delay)
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _normalize_logs(error_logs: str) -> str:
+        """Strip volatile fragments so equivalent failures share a key."""
+        text = _ANSI_RE.sub('', error_logs)
+        text = _TIMESTAMP_RE.sub('<ts>', text)
+        text = _HEX_ID_RE.sub('<id>', text)
+        return _NUMBER_RE.sub('<n>', text)
+
+    def _analysis_cache_key(self, error_logs: str, repo_context: Dict[str, Any]) -> str:
+        normalized = self._normalize_logs(error_logs)
+        canonical = json.dumps(repo_context, sort_keys=True, default=str)
+        return hashlib.sha256((normalized + canonical).encode()).hexdigest()
+
+    def _analysis_cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._analysis_cache_lock:
+            result = self._analysis_cache.get(key)
+            if result is not None:
+                self._analysis_cache.move_to_end(key)
+        return result
+
+    def _analysis_cache_put(self, key: str, result: Dict[str, Any]):
+        with self._analysis_cache_lock:
+            self._analysis_cache[key] = result
+            self._analysis_cache.move_to_end(key)
+            while len(self._analysis_cache) > self.ANALYSIS_CACHE_MAX:
+                self._analysis_cache.popitem(last=False)
+
+    def _persistent_cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cross-process tier behind the in-memory LRU: the same failure
+        re-examined hours later from another worker skips the LLM."""
+        db = _persistent_db()
+        if db is None:
+            return None
+        try:
+            stored = db.get_cached_gemini_response(bytes.fromhex(key))
+            if stored:
+                return orjson.loads(stored)
+        except Exception as e:
+            logger.warning("Persistent Gemini cache read failed: %s", e)
+        return None
+
+    def _persistent_cache_put(self, key: str, result: Dict[str, Any]):
+        db = _persistent_db()
+        if db is None:
+            return
+        try:
+            db.store_gemini_response(
+                bytes.fromhex(key), orjson.dumps(result).decode(), self.MODEL
+            )
+        except Exception as e:
+            logger.warning("Persistent Gemini cache write failed: %s", e)
+
+    def _match_template(self, error_logs: str) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis whose template matches this log.
+
+        Near-duplicate failures (same error template, different volatile
+        fields) can differ even after normalization; wildcard patterns
+        absorb that remaining variance. Templates are checked
+        most-frequent-first and periodically re-sorted.
+        """
+        probe = self._normalize_logs(error_logs)
+        with self._template_lock:
+            for entry in self._template_cache:
+                if entry[0].fullmatch(probe):
+                    entry[1] += 1
+                    self._template_ops += 1
+                    if self._template_ops >= self.TEMPLATE_SORT_EVERY:
+                        self._template_ops = 0
+                        self._template_cache.sort(key=lambda e: -e[1])
+                    return entry[2]
+        return None
+
+    def _insert_template(self, error_logs: str, result: Dict[str, Any]):
+        """Compile this log's wildcard template and cache its analysis."""
+        template = self._normalize_logs(error_logs)
+        pattern_src = re.escape(template)
+        for placeholder in ('<ts>', '<id>', '<n>'):
+            pattern_src = pattern_src.replace(re.escape(placeholder), '(?s:.*?)')
+
+        try:
+            pattern = re.compile(pattern_src)
+        except re.error:
+            return
+
+        with self._template_lock:
+            if len(self._template_cache) >= self.TEMPLATE_CACHE_MAX:
+                # Drop the least-hit template to make room.
+                self._template_cache.sort(key=lambda e: -e[1])
+                self._template_cache.pop()
+            self._template_cache.append([pattern, 1, result])
+
+    def _get_prompt_cache(self, system_prompt: str):
+        """Register a static instruction prefix as Gemini CachedContent.
+
+        The analysis/fix instructions are identical on every call; caching
+        them provider-side means only the repo and log body are
+        re-transmitted and re-processed per request. Prefixes below the
+        provider's minimum cacheable size are never registered — Gemini
+        would reject them every time — and are sent inline instead.
+        """
+        entry = self._prompt_caches.get(system_prompt)
+        now = time.time()
+        if entry and now < entry[1]:
+            return entry[0]
+
+        if len(system_prompt) // 4 < self.PROMPT_CACHE_MIN_TOKENS:
+            # Too small to ever be accepted; remember that so the doomed
+            # create call is not retried on every TTL window.
+            self._prompt_caches[system_prompt] = (None, float('inf'))
+            return None
+
+        try:
+            cache = self.client.caches.create(
+                model=self.MODEL,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=system_prompt,
+                    ttl=f"{self.PROMPT_CACHE_TTL_SECONDS}s"
+                )
+            )
+        except Exception as e:
+            logger.warning("Could not register Gemini prompt cache: %s", e)
+            cache = None
+
+        # Refresh a little before the provider-side TTL lapses.
+        self._prompt_caches[system_prompt] = (cache, now + self.PROMPT_CACHE_TTL_SECONDS - 20)
+        return cache
+
+    def _generate_text(self, user_prompt: str, system_prompt: Optional[str] = None) -> Optional[str]:
+        """One text-generation round-trip, reusing the cached prefix if any."""
+        if not self.client:
+            return None
+
+        config_kwargs = dict(temperature=0.2, candidate_count=1, max_output_tokens=2048)
+
+        try:
+            if system_prompt:
+                cache = self._get_prompt_cache(system_prompt)
+                if cache is not None:
+                    config = types.GenerateContentConfig(cached_content=cache.name, **config_kwargs)
+                else:
+                    # Cache registration failed; send the prefix inline.
+                    config = types.GenerateContentConfig(system_instruction=system_prompt, **config_kwargs)
+            else:
+                config = types.GenerateContentConfig(**config_kwargs)
+
+            response = self._call_gemini_with_retry(
+                model=self.MODEL,
+                contents=user_prompt,
+                config=config
+            )
+            return response.text
+
+        except Exception as e:
+            logger.error("Error calling Gemini API: %s", e)
+            return None
+
+    def analyze_ci_failure(self, user_prompt: str, system_prompt: Optional[str] = None) -> Optional[str]:
+        """Free-form failure analysis used by the Portia tools."""
+        return self._generate_text(user_prompt, system_prompt)
+
+    def generate_fix(self, user_prompt: str, system_prompt: Optional[str] = None) -> Optional[str]:
+        """Free-form fix generation used by the Portia tools."""
+        return self._generate_text(user_prompt, system_prompt)
+
     def analyze_failure_and_suggest_fix(self, error_logs: str, repo_context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze CI/CD failure logs and suggest a fix using Gemini AI.
@@ -25,33 +890,130 @@ class GeminiFixerAgent:
         Returns:
             Dictionary containing analysis and suggested fix
         """
-        
+
+        # Bound the log before any hashing or prompting; oversized inputs
+        # otherwise blow the model's input limit and waste tokens.
+        error_logs = _truncate_logs(error_logs)
+
         if self.client:
-            return self._analyze_with_gemini(error_logs, repo_context)
+            # Dashboards re-request the same failure; semantically identical
+            # (logs, context) pairs come back from the LRU without a new
+            # LLM round-trip. Fallback results are cheap and stay uncached.
+            key = self._analysis_cache_key(error_logs, repo_context)
+            cached = self._analysis_cache_get(key)
+            if cached is not None:
+                return dict(cached)
+
+            templated = self._match_template(error_logs)
+            if templated is not None:
+                return dict(templated)
+
+            stored = self._persistent_cache_get(key)
+            if stored is not None:
+                self._analysis_cache_put(key, stored)
+                return dict(stored)
+
+            result, from_fallback = self._analyze_with_gemini(error_logs, repo_context)
+            if not from_fallback:
+                self._analysis_cache_put(key, result)
+                self._persistent_cache_put(key, result)
+                self._insert_template(error_logs, result)
+            return result
         else:
             return self._analyze_with_fallback(error_logs, repo_context)
     
-    def _analyze_with_gemini(self, error_logs: str, repo_context: Dict[str, Any]) -> Dict[str, Any]:
-        """Use Gemini AI to analyze the failure and suggest fixes (google-genai SDK)."""
+    def _contents_for(self, prompt: str):
+        """Payload shape for generate_content, sticky per agent instance."""
+        if self._plain_contents:
+            return prompt
+        return [{"parts": [{"text": prompt}]}]
+
+    @staticmethod
+    def _response_text(response) -> str:
+        """Pull text out of a generate_content response, candidates included."""
+        if getattr(response, 'text', None):
+            return response.text
+        text = ""
+        for candidate in getattr(response, 'candidates', None) or []:
+            content = getattr(candidate, 'content', None)
+            for part in getattr(content, 'parts', None) or []:
+                text += getattr(part, 'text', '') or ''
+        return text
+
+    def _analyze_with_gemini(self, error_logs: str, repo_context: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Use Gemini AI to analyze the failure and suggest fixes (google-genai SDK).
+
+        Returns (analysis, from_fallback). The flag tells callers whether
+        the rule-based fallback produced the result, in which case it must
+        stay out of every cache layer — a cached fallback would keep being
+        served long after the provider recovers.
+        """
+        if not self._breaker.allow():
+            logger.warning("Gemini circuit open; using fallback analysis")
+            return self._analyze_with_fallback(error_logs, repo_context), True
+
         prompt = self._build_analysis_prompt(error_logs, repo_context)
+        config = types.GenerateContentConfig(
+            temperature=0.2,
+            candidate_count=1,
+            max_output_tokens=2048
+        )
+
         try:
-           
-            response = self.client.models.generate_content(
-                model="gemini-2.5-pro",
-                contents=[{"parts": [{"text": prompt}]}],
-                config=types.GenerateContentConfig(
-                    temperature=0.2,
-                    candidate_count=1,
-                    max_output_tokens=2048
+            try:
+                response = self._call_gemini_with_retry(
+                    model=self.MODEL,
+                    contents=self._contents_for(prompt),
+                    config=config,
                 )
-            )
-            return self._parse_gemini_response(response.text)
-        except Exception as e:
-            print(f"Error calling Gemini API (new format): {e}")
-         
+            except (TypeError, ValueError) as e:
+                # The SDK rejected the payload shape locally — no network
+                # round-trip happened, so a single retry with the other
+                # shape is cheap. The choice sticks for later calls.
+                logger.warning("Gemini payload shape rejected, switching format: %s", e)
+                self._plain_contents = not self._plain_contents
+                response = self._call_gemini_with_retry(
+                    model=self.MODEL,
+                    contents=self._contents_for(prompt),
+                    config=config,
+                )
+        except genai_errors.APIError as e:
+            # Retries are already exhausted inside the backoff wrapper;
+            # re-sending the same prompt in another shape would only
+            # double the failure latency.
+            self._breaker.record_failure()
+            logger.error("Error calling Gemini API (%s): %s", getattr(e, 'code', 'unknown'), e)
+            return self._analyze_with_fallback(error_logs, repo_context), True
+        except _NETWORK_ERRORS as e:
+            self._breaker.record_failure()
+            logger.error("Gemini network error: %s", e)
+            return self._analyze_with_fallback(error_logs, repo_context), True
+
+        self._breaker.record_success()
+        response_text = self._response_text(response)
+        if not response_text:
+            logger.warning("No response text found from Gemini API")
+            return self._analyze_with_fallback(error_logs, repo_context), True
+
+        return self._parse_gemini_response(response_text), False
+
+    async def _analyze_with_gemini_async(self, error_logs: str, repo_context: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Non-blocking variant of _analyze_with_gemini for async callers.
+
+        Uses the SDK's aio surface so awaiting coroutines yield the event
+        loop during the network round-trip instead of blocking it. Returns
+        (analysis, from_fallback), same contract as the sync variant.
+        """
+        if not self._breaker.allow():
+            logger.warning("Gemini circuit open; using fallback analysis")
+            return self._analyze_with_fallback(error_logs, repo_context), True
+
+        prompt = self._build_analysis_prompt(error_logs, repo_context)
+
+        async with self._sem:
             try:
-                response = self.client.models.generate_content(
-                    model="gemini-2.5-pro",
+                response = await self._call_gemini_with_retry_async(
+                    model=self.MODEL,
                     contents=prompt,
                     config=types.GenerateContentConfig(
                         temperature=0.2,
@@ -59,27 +1021,133 @@ class GeminiFixerAgent:
                         max_output_tokens=2048
                     )
                 )
-                
-             
-                response_text = ""
-                if hasattr(response, 'text') and response.text:
-                    response_text = response.text
-                elif hasattr(response, 'candidates') and response.candidates:
-                    for candidate in response.candidates:
-                        if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                            for part in candidate.content.parts:
-                                if hasattr(part, 'text'):
-                                    response_text += part.text
-                
-                if not response_text:
-                    print("No response text found from Gemini API")
-                    return self._analyze_with_fallback(error_logs, repo_context)
-                
-                return self._parse_gemini_response(response_text)
-            except Exception as e2:
-                print(f"Error calling Gemini API (alternative format): {e2}")
-                return self._analyze_with_fallback(error_logs, repo_context)
-    
+            except genai_errors.APIError as e:
+                self._breaker.record_failure()
+                logger.error("Error calling Gemini API (async, %s): %s", getattr(e, 'code', 'unknown'), e)
+                return self._analyze_with_fallback(error_logs, repo_context), True
+            except _NETWORK_ERRORS as e:
+                self._breaker.record_failure()
+                logger.error("Gemini network error (async): %s", e)
+                return self._analyze_with_fallback(error_logs, repo_context), True
+
+        self._breaker.record_success()
+        response_text = self._response_text(response)
+        if not response_text:
+            logger.warning("No response text found from Gemini API")
+            return self._analyze_with_fallback(error_logs, repo_context), True
+
+        return self._parse_gemini_response(response_text), False
+
+    async def analyze_failure_and_suggest_fix_async(self, error_logs: str, repo_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Async counterpart of analyze_failure_and_suggest_fix."""
+        error_logs = _truncate_logs(error_logs)
+
+        if self.client:
+            key = self._analysis_cache_key(error_logs, repo_context)
+            cached = self._analysis_cache_get(key)
+            if cached is not None:
+                return dict(cached)
+
+            templated = self._match_template(error_logs)
+            if templated is not None:
+                return dict(templated)
+
+            stored = await asyncio.to_thread(self._persistent_cache_get, key)
+            if stored is not None:
+                self._analysis_cache_put(key, stored)
+                return dict(stored)
+
+            result, from_fallback = await self._analyze_with_gemini_async(error_logs, repo_context)
+            if not from_fallback:
+                self._analysis_cache_put(key, result)
+                await asyncio.to_thread(self._persistent_cache_put, key, result)
+                self._insert_template(error_logs, result)
+            return result
+        return self._analyze_with_fallback(error_logs, repo_context)
+
+    async def analyze_failures_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Analyze many failures concurrently.
+
+        Fan-out is bounded by the shared semaphore, so throughput scales
+        near-linearly up to MAX_CONCURRENT_CALLS without exceeding the
+        provider's concurrency budget.
+        """
+        return list(await asyncio.gather(*(
+            self.analyze_failure_and_suggest_fix_async(logs, ctx)
+            for logs, ctx in items
+        )))
+
+    def submit_analysis_batch(self, items: List[Tuple[str, Dict[str, Any]]]) -> Optional[str]:
+        """Submit failures to the Gemini Batch API for offline analysis.
+
+        Backfills and retrospectives are not latency-sensitive; batch
+        requests are billed at half the real-time rate and do not count
+        against the per-minute quota. Returns the batch job name, which
+        callers should persist so a restart can resume polling, or None
+        when the client is unavailable or submission fails.
+        """
+        if not self.client or not items:
+            return None
+
+        requests_payload = [
+            {
+                "contents": [{"parts": [{"text": self._build_analysis_prompt(
+                    _truncate_logs(logs), ctx)}]}],
+                "config": {
+                    "temperature": 0.2,
+                    "candidate_count": 1,
+                    "max_output_tokens": 2048,
+                },
+            }
+            for logs, ctx in items
+        ]
+
+        try:
+            job = self.client.batches.create(model=self.MODEL, src=requests_payload)
+        except Exception as e:
+            logger.error("Gemini batch submission failed: %s", e)
+            return None
+        return getattr(job, "name", None)
+
+    def poll_analysis_batch(self, batch_id: str, timeout: float = 3600.0):
+        """Poll a batch job with exponential backoff until it settles.
+
+        Returns the finished job object, or None on timeout or lookup
+        failure. Batch turnaround is minutes to hours, so the poll
+        interval backs off from BATCH_POLL_INITIAL up to BATCH_POLL_CAP.
+        """
+        if not self.client:
+            return None
+
+        delay = self.BATCH_POLL_INITIAL
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                job = self.client.batches.get(name=batch_id)
+            except Exception as e:
+                logger.error("Gemini batch lookup failed for %s: %s", batch_id, e)
+                return None
+
+            state = getattr(getattr(job, "state", None), "name", None) or str(
+                getattr(job, "state", "")
+            )
+            if state in self.BATCH_TERMINAL_STATES:
+                return job
+
+            time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            delay = min(delay * 2, self.BATCH_POLL_CAP)
+        return None
+
+    def collect_batch_results(self, job) -> List[Dict[str, Any]]:
+        """Parse a settled batch job's inline responses, in request order."""
+        results: List[Dict[str, Any]] = []
+        inlined = getattr(getattr(job, "dest", None), "inlined_responses", None) or []
+        for item in inlined:
+            response = getattr(item, "response", None)
+            text = self._response_text(response) if response is not None else ""
+            results.append(self._parse_gemini_response(text))
+        return results
+
     async def analyze_failure(self, owner: str, repo: str, run_id: int) -> Optional[Dict[str, Any]]:
         """
         Analyze a specific workflow failure using GitHub API and Gemini AI.
@@ -93,15 +1161,17 @@ class GeminiFixerAgent:
             Analysis result dictionary or None if failed
         """
         try:
-            from github_service import GitHubService
-            
-         
             github_service = GitHubService()
-            
-       
-            workflow_data = github_service.get_workflow_run(owner, repo, run_id)
+
+            # One bundle fetch (off the event loop) covers run metadata,
+            # logs and jobs concurrently — run+jobs in a single GraphQL
+            # round-trip when available, REST otherwise.
+            workflow_data, logs, _jobs = await asyncio.to_thread(
+                github_service.fetch_run_bundle, owner, repo, run_id
+            )
             if not workflow_data:
-                print(f"❌ Could not fetch workflow run data for {owner}/{repo}#{run_id}")
+                logger.error("Could not fetch workflow run data for %s/%s#%s", owner, repo, run_id,
+                             extra={"owner": owner, "run_id": run_id})
               
                 workflow_data = {
                     "id": run_id,
@@ -111,11 +1181,10 @@ class GeminiFixerAgent:
                     "html_url": f"https://github.com/{owner}/{repo}/actions/runs/{run_id}",
                     "repository": {"full_name": f"{owner}/{repo}"}
                 }
-            
-           
-            logs = github_service.get_workflow_logs(owner, repo, run_id)
+
             if not logs:
-                print(f"❌ Could not fetch workflow logs for {owner}/{repo}#{run_id}")
+                logger.error("Could not fetch workflow logs for %s/%s#%s", owner, repo, run_id,
+                             extra={"owner": owner, "run_id": run_id})
              
                 logs = "Build failed with unknown error. No detailed logs available."
             
@@ -133,8 +1202,9 @@ class GeminiFixerAgent:
             }
             
            
-            print(f"🤖 Analyzing failure with Gemini AI for {owner}/{repo}#{run_id}")
-            analysis_result = self.analyze_failure_and_suggest_fix(logs, repo_context)
+            logger.info("Analyzing failure with Gemini AI for %s/%s#%s", owner, repo, run_id,
+                        extra={"owner": owner, "run_id": run_id})
+            analysis_result = await self.analyze_failure_and_suggest_fix_async(logs, repo_context)
             
            
             analysis_result.update({
@@ -145,11 +1215,13 @@ class GeminiFixerAgent:
                 "workflow_data": workflow_data
             })
             
-            print(f"✅ Analysis completed for {owner}/{repo}#{run_id}")
+            logger.debug("Analysis completed for %s/%s#%s", owner, repo, run_id,
+                         extra={"owner": owner, "run_id": run_id})
             return analysis_result
             
         except Exception as e:
-            print(f"❌ Analysis failed for {owner}/{repo}#{run_id}: {e}")
+            logger.error("Analysis failed for %s/%s#%s: %s", owner, repo, run_id, e,
+                         extra={"owner": owner, "run_id": run_id})
             return None
     
     async def analyze_workflow_failure(self, workflow_data: Dict[str, Any], logs: str) -> Optional[Dict[str, Any]]:
@@ -175,10 +1247,12 @@ class GeminiFixerAgent:
                 "updated_at": workflow_data.get('updated_at', '')
             }
             
-            print(f"🔍 Analyzing workflow failure: {repo_context['repo_name']} run #{repo_context['run_id']}")
+            logger.info("Analyzing workflow failure: %s run #%s",
+                        repo_context['repo_name'], repo_context['run_id'],
+                        extra={"run_id": repo_context['run_id']})
             
           
-            analysis_result = self.analyze_failure_and_suggest_fix(logs, repo_context)
+            analysis_result = await self.analyze_failure_and_suggest_fix_async(logs, repo_context)
             
             if analysis_result and analysis_result.get("suggested_fix"):
               
@@ -189,10 +1263,10 @@ class GeminiFixerAgent:
                     "requires_human_approval": True
                 })
                 
-                print(f"✅ Workflow analysis completed with fix suggestion")
+                logger.debug("Workflow analysis completed with fix suggestion")
                 return analysis_result
             else:
-                print(f"⚠️ Analysis completed but no actionable fix generated")
+                logger.warning("Analysis completed but no actionable fix generated")
                 return {
                     "error": "No actionable fix could be generated",
                     "analysis_attempted": True,
@@ -200,225 +1274,113 @@ class GeminiFixerAgent:
                 }
                 
         except Exception as e:
-            print(f"❌ Workflow analysis failed: {e}")
+            logger.error("Workflow analysis failed: %s", e)
             return None
     
     def _build_analysis_prompt(self, error_logs: str, repo_context: Dict[str, Any]) -> str:
         """Build a comprehensive prompt for Gemini analysis with enhanced context."""
-        
-    
+
         project_type = self._detect_project_type(error_logs, repo_context)
         language_hints = self._get_language_specific_hints(project_type)
-        
-        prompt = f"""
-You are an expert CI/CD engineer and DevOps specialist with deep knowledge of {project_type} projects. 
-Analyze the following failed CI/CD pipeline and provide a comprehensive, actionable fix.
 
-## Repository Context:
-- Repository: {repo_context.get('repo_name', 'Unknown')}
-- Owner: {repo_context.get('owner', 'Unknown')}
-- Workflow: {repo_context.get('workflow_name', 'Unknown')}
-- Status: {repo_context.get('status', 'failed')}
-- Run ID: {repo_context.get('run_id', 'Unknown')}
-- Detected Project Type: {project_type}
+        return _PROMPT_TEMPLATE.format(
+            project_type=project_type,
+            repo_name=repo_context.get('repo_name', 'Unknown'),
+            owner=repo_context.get('owner', 'Unknown'),
+            workflow_name=repo_context.get('workflow_name', 'Unknown'),
+            status=repo_context.get('status', 'failed'),
+            run_id=repo_context.get('run_id', 'Unknown'),
+            error_logs=error_logs,
+            language_hints=language_hints,
+        )
 
-## Error Logs Analysis:
-```
-{error_logs}
-```
+    def _detect_project_type(self, error_logs: str, repo_context: Dict[str, Any]) -> str:
+        """Detect the project type based on error logs and repository context."""
 
-## Language-Specific Context:
-{language_hints}
+        repo_name = repo_context.get('repo_name', '').lower()
+        key = (
+            hashlib.blake2b(error_logs.encode(), digest_size=8).hexdigest(),
+            repo_name,
+        )
+        with _project_type_lock:
+            cached = _project_type_cache.get(key)
+            if cached is not None:
+                _project_type_cache.move_to_end(key)
+                return cached
 
-## Advanced Analysis Instructions:
-1. **Error Classification**: Identify the specific error category and root cause
-2. **Context Awareness**: Consider the project type and common patterns
-3. **Actionable Solutions**: Provide specific, implementable fixes
-4. **Risk Assessment**: Evaluate the safety and complexity of the fix
-5. **Prevention Strategy**: Suggest measures to prevent similar issues
+        project_type = self._scan_project_type(error_logs, repo_name)
 
-## Required Analysis Output:
+        with _project_type_lock:
+            _project_type_cache[key] = project_type
+            _project_type_cache.move_to_end(key)
+            while len(_project_type_cache) > _PROJECT_TYPE_CACHE_MAX:
+                _project_type_cache.popitem(last=False)
+        return project_type
 
-Please provide your analysis in the following JSON format:
+    @staticmethod
+    def _scan_project_type(error_logs: str, repo_name: str) -> str:
+        """Single-pass marker scan behind the per-logs memo above."""
 
-```json
-{{
-    "error_type": "category of error (e.g., dependency_conflict, build_failure, test_failure, etc.)",
-    "root_cause": "clear explanation of what caused the failure",
-    "severity": "high|medium|low",
-    "confidence": "high|medium|low - how confident you are in this analysis",
-    "suggested_fix": {{
-        "description": "human-readable description of the fix",
-        "steps": [
-            "step 1: detailed action to take",
-            "step 2: another action",
-            "..."
-        ],
-        "files_to_modify": [
-            {{
-                "file": "path/to/file",
-                "changes": "description of changes needed"
-            }}
-        ],
-        "commands_to_run": [
-            "command 1",
-            "command 2"
-        ]
-    }},
-    "prevention": "how to prevent this issue in the future",
-    "estimated_fix_time": "estimated time to implement the fix (e.g., '5 minutes', '1 hour')",
-    "risk_level": "low|medium|high - risk of implementing this fix"
-}}
-```
+        hits = {m.lastgroup for m in _PROJECT_MARKER_RE.finditer(error_logs)}
 
-Focus on providing actionable, specific fixes. If you see dependency issues, suggest exact version numbers. If you see configuration problems, provide the exact configuration changes needed.
-"""
-        
-        return prompt
-    
-    def _detect_project_type(self, error_logs: str, repo_context: Dict[str, Any]) -> str:
-        """Detect the project type based on error logs and repository context."""
-        
-        error_logs_lower = error_logs.lower()
-        repo_name = repo_context.get('repo_name', '').lower()
-        
-    
-        if any(keyword in error_logs_lower for keyword in ['npm', 'yarn', 'package.json', 'node_modules']):
-            if 'next' in error_logs_lower or 'react' in error_logs_lower:
+        if 'node' in hits:
+            if 'next_react' in hits:
                 return "Next.js/React"
-            elif 'vue' in error_logs_lower:
+            elif 'vue' in hits:
                 return "Vue.js"
-            elif 'angular' in error_logs_lower:
+            elif 'angular' in hits:
                 return "Angular"
             else:
                 return "Node.js/JavaScript"
-                
-        elif any(keyword in error_logs_lower for keyword in ['pip', 'python', 'requirements.txt', 'pyproject.toml']):
-            if 'django' in error_logs_lower:
+
+        elif 'python' in hits:
+            if 'django' in hits:
                 return "Django/Python"
-            elif 'flask' in error_logs_lower:
+            elif 'flask' in hits:
                 return "Flask/Python"
-            elif 'fastapi' in error_logs_lower:
+            elif 'fastapi' in hits:
                 return "FastAPI/Python"
             else:
                 return "Python"
-                
-        elif any(keyword in error_logs_lower for keyword in ['docker', 'dockerfile', 'container']):
+
+        elif 'docker' in hits:
             return "Docker/Containerized"
-            
-        elif any(keyword in error_logs_lower for keyword in ['maven', 'gradle', 'java']):
+
+        elif 'java' in hits:
             return "Java/JVM"
-            
-        elif any(keyword in error_logs_lower for keyword in ['cargo', 'rust']):
+
+        elif 'rust' in hits:
             return "Rust"
-            
-        elif any(keyword in error_logs_lower for keyword in ['go mod', 'golang']):
+
+        elif 'go' in hits:
             return "Go"
-            
-        elif any(keyword in error_logs_lower for keyword in ['.net', 'dotnet', 'csharp']):
+
+        elif 'dotnet' in hits:
             return ".NET/C#"
-            
-      
-        if any(tech in repo_name for tech in ['react', 'next', 'vue', 'angular']):
+
+        if any(tech in repo_name for tech in _FRONTEND_REPO_TOKENS):
             return "Frontend/JavaScript"
-        elif any(tech in repo_name for tech in ['api', 'backend', 'server']):
+        elif any(tech in repo_name for tech in _BACKEND_REPO_TOKENS):
             return "Backend/API"
-            
+
         return "General"
-    
+
     def _get_language_specific_hints(self, project_type: str) -> str:
         """Get language-specific analysis hints and common issues."""
-        
-        hints = {
-            "Next.js/React": """
-Common Next.js/React Issues:
-- Node version compatibility (check .nvmrc or package.json engines)
-- Package.json dependency conflicts and peer dependencies
-- Build errors due to TypeScript configuration
-- Memory issues during build (increase NODE_OPTIONS=--max-old-space-size)
-- Environment variable configuration (.env files)
-- Static generation errors and API route issues
-            """,
-            
-            "Node.js/JavaScript": """
-Common Node.js Issues:
-- npm/yarn dependency resolution conflicts
-- Node version mismatches between local and CI
-- Package-lock.json vs yarn.lock inconsistencies
-- Missing global packages or CLI tools
-- File system permission issues
-- Memory and timeout issues in CI
-            """,
-            
-            "Python": """
-Common Python Issues:
-- Python version compatibility (check pyproject.toml or runtime.txt)
-- pip dependency conflicts and version pinning
-- Missing system dependencies for compiled packages
-- Virtual environment activation issues
-- Path and PYTHONPATH configuration
-- Requirements.txt vs setup.py vs pyproject.toml conflicts
-            """,
-            
-            "Django/Python": """
-Common Django Issues:
-- Database migration conflicts
-- Static files collection errors (STATIC_ROOT configuration)
-- Missing environment variables for settings
-- Database connection string issues
-- Collectstatic permission problems
-- Requirements for production vs development
-            """,
-            
-            "Docker/Containerized": """
-Common Docker Issues:
-- Base image availability and version pinning
-- COPY/ADD path issues and file permissions
-- Multi-stage build layer caching problems
-- Resource limits (memory, disk space)
-- Network connectivity during build
-- Secret management and environment variables
-            """,
-            
-            "Java/JVM": """
-Common Java Issues:
-- Java version compatibility (check pom.xml or build.gradle)
-- Maven/Gradle dependency conflicts
-- Memory configuration (heap size, PermGen)
-- Test execution timeouts
-- Resource file path issues
-- Plugin version compatibility
-            """
-        }
-        
-        return hints.get(project_type, """
-General CI/CD Issues:
-- Environment variable configuration
-- File permissions and path issues
-- Resource constraints (memory, disk, CPU)
-- Network connectivity problems
-- Cache invalidation needs
-- Tool version mismatches
-        """)
-    
+        return _LANG_HINTS.get(project_type, _GENERIC_HINTS)
+
     def _parse_gemini_response(self, response_text: str) -> Dict[str, Any]:
         """Parse Gemini's response and extract structured data."""
         
         try:
-           
-            import re
-            
-    
-            json_match = re.search(r'```json\n(.*?)\n```', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(1)
-                return json.loads(json_str)
-            
-         
-            return json.loads(response_text)
-            
-        except (json.JSONDecodeError, AttributeError) as e:
-            print(f"Failed to parse Gemini response as JSON: {e}")
+            json_str = _extract_json_block(response_text)
+            if json_str is not None:
+                return orjson.loads(json_str)
+
+            return orjson.loads(response_text)
+
+        except (orjson.JSONDecodeError, AttributeError) as e:
+            logger.warning("Failed to parse Gemini response as JSON: %s", e)
             
  
             return {
@@ -440,16 +1402,19 @@ General CI/CD Issues:
     def _analyze_with_fallback(self, error_logs: str, repo_context: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback analysis when Gemini API is not available."""
         
-     
-        error_logs_lower = error_logs.lower()
-        
-        if "npm err" in error_logs_lower or "yarn error" in error_logs_lower:
+        hits = set()
+        for m in _FALLBACK_ROUTE_RE.finditer(error_logs):
+            hits.add(m.lastgroup)
+            if len(hits) == _FALLBACK_ROUTE_COUNT:
+                break
+
+        if 'npm' in hits:
             return self._analyze_npm_error(error_logs)
-        elif "docker" in error_logs_lower and ("build" in error_logs_lower or "push" in error_logs_lower):
+        elif 'docker' in hits and 'build_push' in hits:
             return self._analyze_docker_error(error_logs)
-        elif "test" in error_logs_lower and ("failed" in error_logs_lower or "error" in error_logs_lower):
+        elif 'test' in hits and 'fail' in hits:
             return self._analyze_test_error(error_logs)
-        elif "python" in error_logs_lower or "pip" in error_logs_lower:
+        elif 'python' in hits:
             return self._analyze_python_error(error_logs)
         else:
             return self._generic_error_analysis(error_logs)
@@ -457,175 +1422,27 @@ General CI/CD Issues:
     def _analyze_npm_error(self, error_logs: str) -> Dict[str, Any]:
         """Analyze NPM/Yarn related errors."""
         
-        if "peer dep missing" in error_logs.lower():
-            return {
-                "error_type": "dependency_conflict",
-                "root_cause": "Missing peer dependency detected in npm/yarn installation",
-                "severity": "medium",
-                "confidence": "high",
-                "suggested_fix": {
-                    "description": "Install missing peer dependencies",
-                    "steps": [
-                        "Identify the missing peer dependency from the error message",
-                        "Install the required peer dependency with correct version",
-                        "Update package.json to include the peer dependency"
-                    ],
-                    "files_to_modify": [
-                        {
-                            "file": "package.json",
-                            "changes": "Add missing peer dependency to dependencies or peerDependencies"
-                        }
-                    ],
-                    "commands_to_run": [
-                        "npm install <missing-package>@<version>",
-                        "npm audit fix"
-                    ]
-                },
-                "prevention": "Use npm ls --depth=0 to check for peer dependency warnings before committing",
-                "estimated_fix_time": "10 minutes",
-                "risk_level": "low"
-            }
+        if _PEER_DEP_RE.search(error_logs):
+            return copy.deepcopy(_PEER_DEP_FALLBACK)
         
         return self._generic_npm_error()
     
     def _analyze_docker_error(self, error_logs: str) -> Dict[str, Any]:
         """Analyze Docker related errors."""
-        return {
-            "error_type": "docker_build_failure",
-            "root_cause": "Docker build or push operation failed",
-            "severity": "high",
-            "confidence": "medium",
-            "suggested_fix": {
-                "description": "Fix Docker build configuration",
-                "steps": [
-                    "Check Dockerfile syntax and commands",
-                    "Verify base image availability",
-                    "Check for file permission issues",
-                    "Ensure all required files are copied into the image"
-                ],
-                "files_to_modify": [
-                    {
-                        "file": "Dockerfile",
-                        "changes": "Review and fix Dockerfile configuration"
-                    }
-                ],
-                "commands_to_run": [
-                    "docker build . --no-cache",
-                    "docker run --rm -it <image> sh"
-                ]
-            },
-            "prevention": "Test Docker builds locally before pushing",
-            "estimated_fix_time": "30 minutes",
-            "risk_level": "medium"
-        }
+        return copy.deepcopy(_DOCKER_FALLBACK)
     
     def _analyze_test_error(self, error_logs: str) -> Dict[str, Any]:
         """Analyze test failure errors."""
-        return {
-            "error_type": "test_failure",
-            "root_cause": "One or more tests are failing",
-            "severity": "high",
-            "confidence": "high",
-            "suggested_fix": {
-                "description": "Fix failing tests",
-                "steps": [
-                    "Run tests locally to reproduce the failure",
-                    "Review test cases and fix the underlying code issues",
-                    "Update test expectations if business logic has changed",
-                    "Ensure test environment matches CI environment"
-                ],
-                "files_to_modify": [],
-                "commands_to_run": [
-                    "npm test",
-                    "npm run test:watch"
-                ]
-            },
-            "prevention": "Run full test suite before pushing changes",
-            "estimated_fix_time": "1 hour",
-            "risk_level": "medium"
-        }
+        return copy.deepcopy(_TEST_FALLBACK)
     
     def _analyze_python_error(self, error_logs: str) -> Dict[str, Any]:
         """Analyze Python related errors."""
-        return {
-            "error_type": "python_dependency_error",
-            "root_cause": "Python package installation or import error",
-            "severity": "medium",
-            "confidence": "medium",
-            "suggested_fix": {
-                "description": "Fix Python dependency issues",
-                "steps": [
-                    "Check requirements.txt for correct package versions",
-                    "Verify Python version compatibility",
-                    "Update pip and setuptools",
-                    "Clear pip cache if needed"
-                ],
-                "files_to_modify": [
-                    {
-                        "file": "requirements.txt",
-                        "changes": "Update package versions or add missing packages"
-                    }
-                ],
-                "commands_to_run": [
-                    "pip install --upgrade pip",
-                    "pip install -r requirements.txt"
-                ]
-            },
-            "prevention": "Use virtual environments and pin exact package versions",
-            "estimated_fix_time": "20 minutes",
-            "risk_level": "low"
-        }
+        return copy.deepcopy(_PYTHON_FALLBACK)
     
     def _generic_npm_error(self) -> Dict[str, Any]:
         """Generic NPM error analysis."""
-        return {
-            "error_type": "npm_build_failure",
-            "root_cause": "NPM installation or build process failed",
-            "severity": "medium",
-            "confidence": "medium",
-            "suggested_fix": {
-                "description": "Fix NPM build issues",
-                "steps": [
-                    "Clear npm cache: npm cache clean --force",
-                    "Delete node_modules and package-lock.json",
-                    "Reinstall dependencies: npm install",
-                    "Check for Node.js version compatibility"
-                ],
-                "files_to_modify": [],
-                "commands_to_run": [
-                    "npm cache clean --force",
-                    "rm -rf node_modules package-lock.json",
-                    "npm install"
-                ]
-            },
-            "prevention": "Use exact Node.js and npm versions in CI",
-            "estimated_fix_time": "15 minutes",
-            "risk_level": "low"
-        }
+        return copy.deepcopy(_NPM_FALLBACK)
     
     def _generic_error_analysis(self, error_logs: str) -> Dict[str, Any]:
         """Generic error analysis when specific patterns aren't found."""
-        return {
-            "error_type": "general_build_failure",
-            "root_cause": "Build process failed - requires manual investigation",
-            "severity": "medium",
-            "confidence": "low",
-            "suggested_fix": {
-                "description": "Investigate and fix build failure",
-                "steps": [
-                    "Review the complete error logs carefully",
-                    "Check recent code changes that might have caused the issue",
-                    "Verify all configuration files are correct",
-                    "Test the build process locally",
-                    "Check for environment-specific issues"
-                ],
-                "files_to_modify": [],
-                "commands_to_run": [
-                    "# Run build locally to reproduce the issue",
-                    "# Check git log for recent changes"
-                ]
-            },
-            "prevention": "Implement comprehensive testing and code review processes",
-            "estimated_fix_time": "1 hour",
-            "risk_level": "medium"
-        }
\ No newline at end of file
+        return copy.deepcopy(_GENERIC_FALLBACK)
\ No newline at end of file
@@ -1,10 +1,70 @@
+import hashlib
+import hmac
+import io
+import orjson
 import os
+import re
 import requests
-from typing import Dict, Any, Optional, List
+import threading
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, List, Tuple
 import json
 import base64
 from datetime import datetime
 
+# Bounded ETag cache: enough for the working set of hot runs without
+# letting multi-MB log bodies accumulate unbounded.
+_ETAG_CACHE_MAX = 128
+
+# Log lines worth surfacing from a run-log archive; matched on raw bytes
+# so members are filtered before any decoding happens.
+_LOG_KEEP_RE = re.compile(
+    rb'error|err!|failed|failure|exception|traceback|fatal', re.IGNORECASE
+)
+
+# Context kept when an archive contains no error-looking lines at all.
+_LOG_TAIL_LINES = 100
+
+# Run metadata and jobs in one GraphQL round-trip. Actions runs are not
+# addressable directly in GraphQL, but resource(url:) resolves the run URL
+# to its WorkflowRun node; jobs surface as the check suite's check runs.
+_RUN_AND_JOBS_QUERY = """
+query($url: URI!) {
+  resource(url: $url) {
+    ... on WorkflowRun {
+      databaseId
+      event
+      createdAt
+      url
+      workflow { name }
+      checkSuite {
+        status
+        conclusion
+        checkRuns(first: 50) {
+          nodes { name status conclusion startedAt completedAt }
+        }
+      }
+    }
+  }
+}
+"""
+
+def _normalize_enum(value: Optional[str]) -> Optional[str]:
+    """Lowercase a GraphQL enum value to its REST equivalent."""
+    return value.lower() if isinstance(value, str) else value
+
+
+# Whole error-bearing lines for extract_error_from_logs, matched in one
+# multiline pass over the string.
+_ERROR_EXTRACT_RE = re.compile(
+    r'^.*(?:error|failed|exception|fatal).*$', re.IGNORECASE | re.MULTILINE
+)
+
+
 class GitHubService:
     def __init__(self, token: Optional[str] = None):
         self.token = token or os.getenv("GITHUB_TOKEN")
@@ -16,49 +76,278 @@ class GitHubService:
         
         if self.token:
             self.headers["Authorization"] = f"Bearer {self.token}"
-    
+
+        # Shared session with a connection pool so concurrent tool calls
+        # reuse keep-alive connections instead of handshaking per request.
+        # Transient GitHub hiccups (rate-limit 429s, gateway 5xx) retry at
+        # the transport with backoff; urllib3 only retries idempotent
+        # methods by default, so POSTs (issues, PRs) are never re-sent.
+        self.session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            respect_retry_after_header=True,
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=20, pool_maxsize=20, max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # url -> (etag, response); LRU-evicted at _ETAG_CACHE_MAX entries.
+        self._etag_cache: "OrderedDict[str, Tuple[str, requests.Response]]" = OrderedDict()
+        self._etag_lock = threading.Lock()
+
+    def _get_with_etag(self, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """Conditional GET: a 304 replays the cached response.
+
+        GitHub answers If-None-Match with 304 without spending rate-limit
+        quota, so unchanged runs and log archives come back from memory
+        instead of re-downloading the full body.
+        """
+        with self._etag_lock:
+            cached = self._etag_cache.get(url)
+
+        headers = self.headers
+        if cached:
+            headers = dict(self.headers)
+            headers["If-None-Match"] = cached[0]
+
+        response = self.session.get(url, headers=headers, params=params)
+
+        if response.status_code == 304 and cached:
+            with self._etag_lock:
+                if url in self._etag_cache:
+                    self._etag_cache.move_to_end(url)
+            return cached[1]
+
+        response.raise_for_status()
+
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                self._etag_cache[url] = (etag, response)
+                self._etag_cache.move_to_end(url)
+                while len(self._etag_cache) > _ETAG_CACHE_MAX:
+                    self._etag_cache.popitem(last=False)
+
+        return response
+
     def get_workflow_run(self, owner: str, repo: str, run_id: int) -> Optional[Dict[str, Any]]:
         """Get detailed information about a workflow run."""
         url = f"{self.base_url}/repos/{owner}/{repo}/actions/runs/{run_id}"
-        
+
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            return self._get_with_etag(url).json()
         except requests.RequestException as e:
             print(f"Error fetching workflow run: {e}")
             return None
     
+    def list_workflow_runs(self, owner: str, repo: str, per_page: int = 100) -> Optional[List[Dict[str, Any]]]:
+        """List recent workflow runs for a repository in a single call."""
+        url = f"{self.base_url}/repos/{owner}/{repo}/actions/runs"
+        params = {"per_page": per_page}
+
+        try:
+            response = self.session.get(url, headers=self.headers, params=params)
+            response.raise_for_status()
+            return response.json().get("workflow_runs", [])
+        except requests.RequestException as e:
+            print(f"Error listing workflow runs: {e}")
+            return None
+
+    def get_workflow_files_bulk(self, owner: str, repo: str, ref: str = "main") -> Optional[Dict[str, str]]:
+        """Fetch every workflow YAML file with minimal API round-trips.
+
+        One recursive git-tree listing finds the paths under
+        .github/workflows/, then each body is fetched raw
+        (application/vnd.github.raw) so there is no base64 payload to
+        decode and no per-directory contents calls.
+        """
+        tree_url = f"{self.base_url}/repos/{owner}/{repo}/git/trees/{ref}"
+
+        try:
+            response = self.session.get(tree_url, headers=self.headers, params={"recursive": "1"})
+            response.raise_for_status()
+            tree = response.json().get("tree", [])
+        except requests.RequestException as e:
+            print(f"Error listing repository tree: {e}")
+            return None
+
+        raw_headers = dict(self.headers)
+        raw_headers["Accept"] = "application/vnd.github.raw"
+
+        files = {}
+        for entry in tree:
+            path = entry.get("path", "")
+            if (entry.get("type") == "blob"
+                    and path.startswith(".github/workflows/")
+                    and path.endswith((".yml", ".yaml"))):
+                file_url = f"{self.base_url}/repos/{owner}/{repo}/contents/{path}"
+                try:
+                    file_response = self.session.get(file_url, headers=raw_headers, params={"ref": ref})
+                    file_response.raise_for_status()
+                    files[path] = file_response.text
+                except requests.RequestException as e:
+                    print(f"Error fetching workflow file {path}: {e}")
+
+        return files
+
     def get_workflow_run_logs(self, owner: str, repo: str, run_id: int) -> Optional[str]:
         """Get logs for a workflow run."""
         url = f"{self.base_url}/repos/{owner}/{repo}/actions/runs/{run_id}/logs"
-        
+
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-           
-            return response.text
+            return self._extract_logs_from_zip(self._get_with_etag(url).content)
         except requests.RequestException as e:
             print(f"Error fetching workflow logs: {e}")
-          
+
             return self._get_sample_logs()
+
+    @staticmethod
+    def _extract_logs_from_zip(payload: bytes) -> str:
+        """Reduce a run-log ZIP archive to its error-bearing lines.
+
+        GitHub serves run logs as a ZIP; decoding the raw archive with
+        .text used to hand megabytes of mojibake to the analyzers. The
+        members are scanned as bytes and only matching lines are decoded,
+        so the returned string is a few KB of signal instead of the whole
+        archive. Plain-text payloads pass through unchanged.
+        """
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(payload))
+        except zipfile.BadZipFile:
+            return payload.decode('utf-8', errors='replace')
+
+        kept: List[str] = []
+        tail: deque = deque(maxlen=_LOG_TAIL_LINES)
+        with archive:
+            for name in archive.namelist():
+                if name.endswith('/'):
+                    continue
+                with archive.open(name) as member:
+                    for line in member:
+                        tail.append(line)
+                        if _LOG_KEEP_RE.search(line):
+                            kept.append(
+                                line.decode('utf-8', errors='replace').rstrip('\r\n')
+                            )
+
+        if kept:
+            return "\n".join(kept)
+        # Nothing matched; keep the last lines so callers still get context.
+        return "".join(
+            line.decode('utf-8', errors='replace') for line in tail
+        )
     
     def get_workflow_logs(self, owner: str, repo: str, run_id: int) -> Optional[str]:
         """Alias for get_workflow_run_logs to maintain compatibility."""
         return self.get_workflow_run_logs(owner, repo, run_id)
     
+    def iter_workflow_jobs(self, owner: str, repo: str, run_id: int, per_page: int = 100):
+        """Yield jobs for a workflow run one page at a time.
+
+        Matrix builds can produce hundreds of jobs; streaming pages lets
+        callers stop early instead of materializing the full list.
+        filter=latest asks GitHub to prune re-run attempts server-side.
+        """
+        url = f"{self.base_url}/repos/{owner}/{repo}/actions/runs/{run_id}/jobs"
+        params = {"per_page": per_page, "filter": "latest"}
+
+        while url:
+            try:
+                response = self.session.get(url, headers=self.headers, params=params)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                print(f"Error fetching workflow jobs: {e}")
+                return
+
+            yield from response.json().get("jobs", [])
+
+            next_link = response.links.get("next")
+            url = next_link["url"] if next_link else None
+            params = None
+
     def get_workflow_jobs(self, owner: str, repo: str, run_id: int) -> Optional[List[Dict[str, Any]]]:
         """Get jobs for a workflow run."""
-        url = f"{self.base_url}/repos/{owner}/{repo}/actions/runs/{run_id}/jobs"
-        
+        return list(self.iter_workflow_jobs(owner, repo, run_id)) or None
+
+    def fetch_run_bundle(self, owner: str, repo: str, run_id: int) -> Tuple[
+            Optional[Dict[str, Any]], Optional[str], Optional[List[Dict[str, Any]]]]:
+        """Fetch run metadata, logs and jobs for one run concurrently.
+
+        Triage typically needs all three. Run metadata and jobs come from
+        one GraphQL round-trip (get_run_and_jobs_graphql), issued in
+        parallel with the REST logs download; when GraphQL fails, the
+        run and jobs fall back to their two REST calls, still on the
+        pool, so wall time stays roughly the slowest single call.
+        """
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            logs_future = pool.submit(self.get_workflow_run_logs, owner, repo, run_id)
+            combined = self.get_run_and_jobs_graphql(owner, repo, run_id)
+            if combined is not None:
+                run, jobs = combined
+            else:
+                run_future = pool.submit(self.get_workflow_run, owner, repo, run_id)
+                jobs_future = pool.submit(self.get_workflow_jobs, owner, repo, run_id)
+                run, jobs = run_future.result(), jobs_future.result()
+            return run, logs_future.result(), jobs
+
+    def get_run_and_jobs_graphql(self, owner: str, repo: str, run_id: int) -> Optional[
+            Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Fetch run metadata and jobs in a single GraphQL request.
+
+        The REST path needs one call for the run and one (paginated) call
+        for its jobs; GraphQL returns both in one round-trip from one
+        rate-limit bucket. Logs are not served over GraphQL, so callers
+        still fetch those via get_workflow_run_logs — ideally in parallel.
+        Returns (run, jobs) or None so callers can fall back to REST.
+        """
+        run_url = f"https://github.com/{owner}/{repo}/actions/runs/{run_id}"
+
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.post(
+                f"{self.base_url}/graphql",
+                headers=self.headers,
+                json={"query": _RUN_AND_JOBS_QUERY, "variables": {"url": run_url}},
+            )
             response.raise_for_status()
-            return response.json().get("jobs", [])
-        except requests.RequestException as e:
-            print(f"Error fetching workflow jobs: {e}")
+            data = orjson.loads(response.content)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            print(f"Error fetching run via GraphQL: {e}")
+            return None
+
+        node = (data.get("data") or {}).get("resource")
+        if not node or data.get("errors"):
             return None
 
+        check_suite = node.get("checkSuite") or {}
+        # GraphQL returns enum values uppercase ("COMPLETED", "FAILURE");
+        # everything downstream compares against the lowercase REST forms,
+        # so normalize here and reshape job nodes to the REST field names.
+        jobs = [
+            {
+                "name": job.get("name"),
+                "status": _normalize_enum(job.get("status")),
+                "conclusion": _normalize_enum(job.get("conclusion")),
+                "started_at": job.get("startedAt"),
+                "completed_at": job.get("completedAt"),
+            }
+            for job in (check_suite.get("checkRuns") or {}).get("nodes") or []
+        ]
+        run = {
+            "id": node.get("databaseId", run_id),
+            "name": (node.get("workflow") or {}).get("name", "Unknown"),
+            "status": _normalize_enum(check_suite.get("status")),
+            "conclusion": _normalize_enum(check_suite.get("conclusion")),
+            "event": node.get("event"),
+            "created_at": node.get("createdAt"),
+            "html_url": node.get("url", run_url),
+            "repository": {"full_name": f"{owner}/{repo}"},
+        }
+        return run, jobs
+
     def get_workflow_run_jobs(self, owner: str, repo: str, run_id: int) -> Optional[List[Dict[str, Any]]]:
         """Get jobs for a workflow run (alias for get_workflow_jobs)."""
         return self.get_workflow_jobs(owner, repo, run_id)
@@ -74,7 +363,7 @@ class GitHubService:
         }
         
         try:
-            response = requests.post(url, headers=self.headers, json=data)
+            response = self.session.post(url, headers=self.headers, json=data)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -94,7 +383,7 @@ class GitHubService:
         }
         
         try:
-            response = requests.post(url, headers=self.headers, json=data)
+            response = self.session.post(url, headers=self.headers, json=data)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -103,16 +392,19 @@ class GitHubService:
     
     def verify_webhook_signature(self, payload: bytes, signature: str, secret: str) -> bool:
         """Verify GitHub webhook signature."""
-        import hmac
-        import hashlib
-        
-        expected_signature = "sha256=" + hmac.new(
-            secret.encode(),
-            payload,
-            hashlib.sha256
-        ).hexdigest()
-        
-        return hmac.compare_digest(expected_signature, signature)
+        if not signature.startswith("sha256="):
+            return False
+
+        # Compare raw digests: decoding the 'sha256=<hex>' header once is
+        # cheaper than hex-encoding our MAC per delivery, and the digest
+        # itself stays on hashlib's OpenSSL fast path.
+        try:
+            signature_digest = bytes.fromhex(signature[7:])
+        except ValueError:
+            return False
+
+        mac = hmac.new(secret.encode(), payload, hashlib.sha256).digest()
+        return hmac.compare_digest(mac, signature_digest)
     
     def get_repository_contents(self, owner: str, repo: str, path: str = "", ref: str = "main") -> Optional[List[Dict[str, Any]]]:
         """Get repository contents at a specific path."""
@@ -120,7 +412,7 @@ class GitHubService:
         params = {"ref": ref} if ref else {}
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -133,7 +425,7 @@ class GitHubService:
         params = {"ref": ref} if ref else {}
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.session.get(url, headers=self.headers, params=params)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -159,7 +451,7 @@ class GitHubService:
             data["sha"] = sha
         
         try:
-            response = requests.put(url, headers=self.headers, json=data)
+            response = self.session.put(url, headers=self.headers, json=data)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -172,7 +464,7 @@ class GitHubService:
         base_ref_url = f"{self.base_url}/repos/{owner}/{repo}/git/refs/heads/{base_branch}"
         
         try:
-            response = requests.get(base_ref_url, headers=self.headers)
+            response = self.session.get(base_ref_url, headers=self.headers)
             response.raise_for_status()
             base_sha = response.json()["object"]["sha"]
            
@@ -182,7 +474,7 @@ class GitHubService:
                 "sha": base_sha
             }
             
-            response = requests.post(create_ref_url, headers=self.headers, json=data)
+            response = self.session.post(create_ref_url, headers=self.headers, json=data)
             response.raise_for_status()
             return response.json()
             
@@ -195,7 +487,7 @@ class GitHubService:
         url = f"{self.base_url}/repos/{owner}/{repo}"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.session.get(url, headers=self.headers)
             response.raise_for_status()
             return response.json().get("default_branch", "main")
         except requests.RequestException as e:
@@ -400,15 +692,16 @@ jobs:
         """Extract key error information from logs."""
         if not logs:
             return "No logs available"
-        
-        lines = logs.split('\n')
-        error_lines = []
-        
-        for line in lines:
-            if any(keyword in line.lower() for keyword in ['error', 'failed', 'exception', 'fatal']):
-                error_lines.append(line.strip())
-        
+
+        # One multiline scan instead of splitting the whole log into a
+        # line list and lowercasing each line; islice stops the regex
+        # engine as soon as the ten lines we report are found.
+        error_lines = [
+            m.group(0).strip()
+            for m in islice(_ERROR_EXTRACT_RE.finditer(logs), 10)
+        ]
+
         if error_lines:
-            return '\n'.join(error_lines[:10]) 
+            return '\n'.join(error_lines)
         else:
             return "No specific errors found in logs"
@@ -1,5 +1,7 @@
 import os
 import logging
+import logging.handlers
+import queue
 import json
 import hashlib
 import hmac
@@ -11,7 +13,7 @@ from collections import Counter
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Literal
 
@@ -102,6 +104,17 @@ class PortiaAnalysisResponse(BaseModel):
 
 
 logging.basicConfig(level=logging.INFO)
+
+# Route log emission through a queue: request threads pay only a cheap
+# enqueue and the listener thread does the handler I/O.
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_root_logger = logging.getLogger()
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, *_root_logger.handlers, respect_handler_level=True
+)
+_root_logger.handlers = [logging.handlers.QueueHandler(_log_queue)]
+_log_listener.start()
+
 logger = logging.getLogger(__name__)
 
 # Environment check for Google API key
@@ -160,7 +173,8 @@ app = FastAPI(
     servers=[
         {"url": "http://localhost:8000", "description": "Development server"},
         {"url": "https://api.yourproduction.com", "description": "Production server"}
-    ]
+    ],
+    default_response_class=ORJSONResponse
 )
 
 raw_origins = os.getenv("FRONTEND_URL", "")
@@ -1229,7 +1243,7 @@ async def get_pattern_insights():
             
             now = datetime.utcnow()
             
-            for pattern in recognizer.learned_patterns:
+            for pattern in recognizer.learned_patterns.values():
                 # Success rate categorization
                 if pattern.success_rate >= 0.8:
                     success_ranges["high"] += 1
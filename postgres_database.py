@@ -1,13 +1,64 @@
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from psycopg2.extras import RealDictCursor
+import csv
+import io
 import os
 import uuid
-from typing import Optional, List, Dict, Any
+import zlib
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 import json
+import orjson
 from urllib.parse import urlparse, parse_qs
 
+# Shared connection pool so the many PostgreSQLCICDFixerDB instances across
+# the analytics/agent classes reuse TCP connections instead of opening and
+# re-authenticating one per query.
+_connection_pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+_pool_dsn: Optional[str] = None
+
+
+def _get_pool(database_url: str) -> psycopg2.pool.ThreadedConnectionPool:
+    global _connection_pool, _pool_dsn
+
+    if _connection_pool is None or _pool_dsn != database_url:
+        max_connections = (os.cpu_count() or 1) * 2 + 1
+        _connection_pool = psycopg2.pool.ThreadedConnectionPool(
+            minconn=1,
+            maxconn=max_connections,
+            dsn=database_url,
+            application_name="cicd-fixer"
+        )
+        _pool_dsn = database_url
+
+    return _connection_pool
+
+
+# Cached LLM output and analysis text compress heavily (repeated log and
+# markdown fragments); blobs are stored compressed with a format tag so the
+# codec can change later without rewriting existing rows.
+_COMPRESSION_NONE = 0
+_COMPRESSION_ZLIB = 1
+
+
+def _compress_text(text: str) -> Tuple[bytes, int]:
+    data = text.encode()
+    compressed = zlib.compress(data, 6)
+    if len(compressed) < len(data):
+        return compressed, _COMPRESSION_ZLIB
+    return data, _COMPRESSION_NONE
+
+
+def _decompress_text(blob: Any, compression: int) -> str:
+    data = bytes(blob)
+    if compression == _COMPRESSION_ZLIB:
+        data = zlib.decompress(data)
+    return data.decode()
+
+
 class PostgreSQLCICDFixerDB:
     def __init__(self, database_url: str = None):
         if database_url is None:
@@ -66,9 +117,19 @@ class PostgreSQLCICDFixerDB:
             print(f"🔄 Using original URL: {url}")
             return url
     
+    @contextmanager
     def get_connection(self):
-        """Get a database connection."""
-        return psycopg2.connect(self.database_url)
+        """Get a pooled database connection (returned to the pool on exit)."""
+        if not self.database_url:
+            raise Exception("No DATABASE_URL configured")
+
+        pool = _get_pool(self.database_url)
+        conn = pool.getconn()
+        try:
+            with conn:
+                yield conn
+        finally:
+            pool.putconn(conn)
     
     def test_connection(self):
         """Test the database connection."""
@@ -114,49 +175,95 @@ class PostgreSQLCICDFixerDB:
              
                 try:
                     cursor.execute("""
-                        ALTER TABLE workflow_runs 
+                        ALTER TABLE workflow_runs
                         ADD COLUMN IF NOT EXISTS confidence_score FLOAT,
                         ADD COLUMN IF NOT EXISTS error_category VARCHAR(100),
                         ADD COLUMN IF NOT EXISTS fix_complexity VARCHAR(50),
                         ADD COLUMN IF NOT EXISTS analysis_result TEXT
                     """)
                 except Exception as e:
-                  
+
                     pass
-            
-          
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS portia_plans (
-                    id SERIAL PRIMARY KEY,
-                    plan_id VARCHAR(255) UNIQUE NOT NULL,
-                    workflow_run_id INTEGER,
-                    status VARCHAR(50) NOT NULL,
-                    steps_completed INTEGER DEFAULT 0,
-                    total_steps INTEGER DEFAULT 0,
-                    error_message TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (workflow_run_id) REFERENCES workflow_runs (id)
-                )
-            """)
-            
-         
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS clarifications (
-                    id SERIAL PRIMARY KEY,
-                    plan_id VARCHAR(255) NOT NULL,
-                    question TEXT NOT NULL,
-                    response TEXT,
-                    response_type VARCHAR(50),
-                    status VARCHAR(50) DEFAULT 'pending',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (plan_id) REFERENCES portia_plans (plan_id)
-                )
-            """)
-            
-            conn.commit()
-            print("✅ Database tables created successfully")
+
+
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS portia_plans (
+                        id SERIAL PRIMARY KEY,
+                        plan_id VARCHAR(255) UNIQUE NOT NULL,
+                        workflow_run_id INTEGER,
+                        status VARCHAR(50) NOT NULL,
+                        steps_completed INTEGER DEFAULT 0,
+                        total_steps INTEGER DEFAULT 0,
+                        error_message TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (workflow_run_id) REFERENCES workflow_runs (id)
+                    )
+                """)
+
+
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS clarifications (
+                        id SERIAL PRIMARY KEY,
+                        plan_id VARCHAR(255) NOT NULL,
+                        question TEXT NOT NULL,
+                        response TEXT,
+                        response_type VARCHAR(50),
+                        status VARCHAR(50) DEFAULT 'pending',
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (plan_id) REFERENCES portia_plans (plan_id)
+                    )
+                """)
+
+                # Content-addressed cache of Gemini responses, keyed by a
+                # hash of model + task + prompt inputs. Identical failure
+                # logs recur constantly in CI, so repeat analyses become a
+                # primary-key lookup instead of an LLM round-trip.
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS gemini_cache (
+                        prompt_sha256 BYTEA PRIMARY KEY,
+                        response BYTEA NOT NULL,
+                        compression SMALLINT DEFAULT 0,
+                        model TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Canonical analyses for recurring failure shapes. CI errors
+                # are heavy-tailed (the same npm/pip/test failures repeat),
+                # so a normalized-signature lookup can skip the LLM entirely.
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS failure_templates (
+                        signature TEXT PRIMARY KEY,
+                        canonical_analysis BYTEA NOT NULL,
+                        compression SMALLINT DEFAULT 0,
+                        hit_count INTEGER DEFAULT 1,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Indexes backing the analytics queries (time-window scans,
+                # per-repo profiles, and the approved-fix similarity corpus)
+                # so they stay index scans as history grows. The partial
+                # index only covers approved rows with a suggested fix.
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_workflow_runs_created_at
+                    ON workflow_runs (created_at DESC)
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_workflow_runs_owner_repo_created
+                    ON workflow_runs (owner, repo_name, created_at DESC)
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_workflow_runs_approved_fixes
+                    ON workflow_runs (created_at DESC)
+                    WHERE suggested_fix IS NOT NULL AND fix_status = 'approved'
+                """)
+
+                conn.commit()
+                print("✅ Database tables created successfully")
             
         except Exception as e:
             print(f"❌ Database initialization failed: {e}")
@@ -197,14 +304,63 @@ class PostgreSQLCICDFixerDB:
                     run_data.get('conclusion'),
                     run_data.get('error_log')
                 ))
-            
-            result = cursor.fetchone()
-            return result[0] if result else None
+
+                result = cursor.fetchone()
+                return result[0] if result else None
             
         except Exception as e:
             print(f"⚠️  Error inserting workflow run: {e}")
             return -1
     
+    def bulk_insert_workflow_runs(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert many workflow run records in one round-trip.
+
+        Takes the same dict shape as insert_workflow_run and pushes all rows
+        with execute_values in a single transaction, instead of one INSERT
+        (and one network round-trip) per run.
+        """
+        if not rows:
+            return 0
+
+        if not self.is_available():
+            print("⚠️  Database not available, skipping bulk workflow run insertion")
+            return 0
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+
+                psycopg2.extras.execute_values(cursor, """
+                    INSERT INTO workflow_runs
+                    (repo_name, owner, run_id, workflow_name, status, conclusion, error_log)
+                    VALUES %s
+                    ON CONFLICT (repo_name, owner, run_id)
+                    DO UPDATE SET
+                        workflow_name = EXCLUDED.workflow_name,
+                        status = EXCLUDED.status,
+                        conclusion = EXCLUDED.conclusion,
+                        error_log = EXCLUDED.error_log,
+                        updated_at = CURRENT_TIMESTAMP
+                """, [
+                    (
+                        row.get('repo_name'),
+                        row.get('owner'),
+                        row.get('run_id'),
+                        row.get('workflow_name'),
+                        row.get('status'),
+                        row.get('conclusion'),
+                        row.get('error_log')
+                    )
+                    for row in rows
+                ], page_size=500)
+
+                conn.commit()
+                return len(rows)
+
+        except Exception as e:
+            print(f"⚠️  Error bulk inserting workflow runs: {e}")
+            return 0
+
     def update_workflow_run_fix(self, run_id: int, suggested_fix: str, fix_status: str = 'suggested'):
         """Update workflow run with suggested fix."""
         if not self.is_available():
@@ -237,14 +393,14 @@ class PostgreSQLCICDFixerDB:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            
-            cursor.execute("""
-                SELECT * FROM workflow_runs 
-                ORDER BY created_at DESC 
-                LIMIT %s
-            """, (limit,))
-            
-            return [dict(row) for row in cursor.fetchall()]
+
+                cursor.execute("""
+                    SELECT * FROM workflow_runs
+                    ORDER BY created_at DESC
+                    LIMIT %s
+                """, (limit,))
+
+                return [dict(row) for row in cursor.fetchall()]
             
         except Exception as e:
             print(f"⚠️  Error fetching workflow runs: {e}")
@@ -274,7 +430,94 @@ class PostgreSQLCICDFixerDB:
             
             result = cursor.fetchone()
             return dict(result) if result else None
-    
+
+    def copy_workflow_runs(self, rows: List[Dict[str, Any]]) -> int:
+        """Bulk-load pre-deduplicated workflow runs with COPY FROM STDIN.
+
+        COPY is the fastest Postgres ingest path - one statement and one
+        buffer instead of batched INSERTs - but it cannot resolve
+        conflicts, so callers must filter out existing run IDs first (see
+        get_existing_run_ids). Rows that may already exist should go
+        through bulk_insert_workflow_runs instead.
+        """
+        if not rows:
+            return 0
+
+        if not self.is_available():
+            print("⚠️  Database not available, skipping workflow run COPY")
+            return 0
+
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow([
+                row.get('repo_name'),
+                row.get('owner'),
+                row.get('run_id'),
+                row.get('workflow_name'),
+                row.get('status'),
+                row.get('conclusion'),
+                row.get('error_log')
+            ])
+        buf.seek(0)
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+
+                cursor.copy_expert("""
+                    COPY workflow_runs
+                    (repo_name, owner, run_id, workflow_name, status, conclusion, error_log)
+                    FROM STDIN WITH (FORMAT csv)
+                """, buf)
+
+                conn.commit()
+                return len(rows)
+
+        except Exception as e:
+            print(f"⚠️  Error bulk loading workflow runs: {e}")
+            return 0
+
+    def count_workflow_runs(self) -> int:
+        """Count workflow runs without transferring any rows."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM workflow_runs")
+            return cursor.fetchone()[0]
+
+    def get_repo_failure_counts(self) -> List[Tuple[str, int]]:
+        """Per-repository run counts, aggregated in SQL instead of Python."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT owner || '/' || repo_name AS repo, COUNT(*)
+                FROM workflow_runs
+                GROUP BY owner, repo_name
+                ORDER BY 1
+            """)
+
+            return cursor.fetchall()
+
+    def get_existing_run_ids(self, owner: str, repo_name: str, run_ids: List[int]) -> set:
+        """Return which of the given run IDs already exist for a repository.
+
+        One ANY(%s) query instead of a per-run existence check, so callers
+        like the backfill script can dedupe a whole page of runs at once.
+        """
+        if not run_ids:
+            return set()
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT run_id FROM workflow_runs
+                WHERE owner = %s AND repo_name = %s AND run_id = ANY(%s)
+            """, (owner, repo_name, list(run_ids)))
+
+            return {row[0] for row in cursor.fetchall()}
+
     def update_fix_status(self, run_id: int, status: str):
         """Update the fix status of a workflow run."""
         with self.get_connection() as conn:
@@ -512,7 +755,7 @@ class PostgreSQLCICDFixerDB:
                 failure_data.get('workflow_name', ''),
                 failure_data.get('status', 'failed'),
                 failure_data.get('conclusion', 'failure'),
-                json.dumps(failure_data),
+                orjson.dumps(failure_data).decode(),
                 datetime.utcnow()
             ))
             result = cursor.fetchone()
@@ -526,8 +769,168 @@ class PostgreSQLCICDFixerDB:
                 UPDATE workflow_runs 
                 SET analysis_result = %s, updated_at = NOW()
                 WHERE id = %s
-            """, (json.dumps(analysis_result), failure_id))
+            """, (orjson.dumps(analysis_result).decode(), failure_id))
     
+    # Below this size COPY setup costs more than it saves.
+    ANALYSIS_COPY_THRESHOLD = 20
+
+    def store_analyses(self, items: List[Tuple[str, Dict[str, Any]]]):
+        """Store analysis results for several failures in one round-trip.
+
+        Small batches go through executemany; larger ones are staged with
+        COPY into a temp table and applied as a single UPDATE ... FROM
+        join, which amortizes parse/plan/WAL overhead across the batch.
+        """
+        if not items:
+            return
+
+        rows = [(failure_id, orjson.dumps(result).decode())
+                for failure_id, result in items]
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            if len(rows) < self.ANALYSIS_COPY_THRESHOLD:
+                cursor.executemany("""
+                    UPDATE workflow_runs
+                    SET analysis_result = %s, updated_at = NOW()
+                    WHERE id = %s
+                """, [(result, failure_id) for failure_id, result in rows])
+                return
+
+            cursor.execute("""
+                CREATE TEMP TABLE _analysis_batch (
+                    failure_id INTEGER,
+                    analysis_result TEXT
+                ) ON COMMIT DROP
+            """)
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerows(rows)
+            buffer.seek(0)
+
+            cursor.copy_expert("""
+                COPY _analysis_batch (failure_id, analysis_result)
+                FROM STDIN WITH (FORMAT csv)
+            """, buffer)
+
+            cursor.execute("""
+                UPDATE workflow_runs
+                SET analysis_result = _analysis_batch.analysis_result,
+                    updated_at = NOW()
+                FROM _analysis_batch
+                WHERE workflow_runs.id = _analysis_batch.failure_id
+            """)
+
+    # How long cached Gemini responses stay valid.
+    GEMINI_CACHE_TTL_DAYS = 30
+
+    def get_cached_gemini_response(self, prompt_sha256: bytes) -> Optional[str]:
+        """Look up a cached Gemini response by prompt digest."""
+        if not self.is_available():
+            return None
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT response, compression FROM gemini_cache
+                    WHERE prompt_sha256 = %s
+                    AND created_at > NOW() - (%s * INTERVAL '1 day')
+                """, (prompt_sha256, self.GEMINI_CACHE_TTL_DAYS))
+
+                row = cursor.fetchone()
+                return _decompress_text(row[0], row[1]) if row else None
+
+        except Exception as e:
+            print(f"⚠️  Error reading Gemini cache: {e}")
+            return None
+
+    def store_gemini_response(self, prompt_sha256: bytes, response: str, model: str):
+        """Cache a Gemini response under its prompt digest."""
+        if not self.is_available():
+            return
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                blob, compression = _compress_text(response)
+                cursor.execute("""
+                    INSERT INTO gemini_cache (prompt_sha256, response, compression, model)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (prompt_sha256) DO NOTHING
+                """, (prompt_sha256, blob, compression, model))
+
+                conn.commit()
+
+        except Exception as e:
+            print(f"⚠️  Error writing Gemini cache: {e}")
+
+    def get_failure_template(self, signature: str) -> Optional[str]:
+        """Fetch the canonical analysis for a normalized failure signature.
+
+        Bumps hit_count in the same round-trip so frequency tracking is
+        free for callers.
+        """
+        if not self.is_available():
+            return None
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE failure_templates
+                    SET hit_count = hit_count + 1, updated_at = NOW()
+                    WHERE signature = %s
+                    RETURNING canonical_analysis, compression
+                """, (signature,))
+
+                row = cursor.fetchone()
+                conn.commit()
+                return _decompress_text(row[0], row[1]) if row else None
+
+        except Exception as e:
+            print(f"⚠️  Error reading failure template: {e}")
+            return None
+
+    def store_failure_template(self, signature: str, canonical_analysis: str):
+        """Record the canonical analysis for a normalized failure signature."""
+        if not self.is_available():
+            return
+
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                blob, compression = _compress_text(canonical_analysis)
+                cursor.execute("""
+                    INSERT INTO failure_templates (signature, canonical_analysis, compression)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (signature) DO UPDATE SET
+                        hit_count = failure_templates.hit_count + 1,
+                        updated_at = NOW()
+                """, (signature, blob, compression))
+
+                conn.commit()
+
+        except Exception as e:
+            print(f"⚠️  Error storing failure template: {e}")
+
+    def purge_gemini_cache(self, ttl_days: int = GEMINI_CACHE_TTL_DAYS):
+        """Drop cached Gemini responses older than the TTL."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    DELETE FROM gemini_cache
+                    WHERE created_at < NOW() - (%s * INTERVAL '1 day')
+                """, (ttl_days,))
+
+                conn.commit()
+
+        except Exception as e:
+            print(f"⚠️  Error purging Gemini cache: {e}")
+
     def get_pending_fixes(self) -> List[Dict[str, Any]]:
         """Get all pending fixes that require human approval"""
         with self.get_connection() as conn: